@@ -4,16 +4,18 @@ Voice processing API endpoints.
 
 import time
 from typing import Optional
-from fastapi import APIRouter, HTTPException, UploadFile, File, Form, Depends
+from fastapi import APIRouter, HTTPException, UploadFile, File, Form, Depends, Request, Response
 from sqlalchemy.orm import Session
 from loguru import logger
 
 from ...services.voice_processing import (
-    whisper_service,
-    tts_service,
-    hotword_service,
-    decode_audio_base64,
-    encode_audio_base64,
+    WhisperService,
+    KokoroTTSService,
+    PorcupineHotwordService,
+    get_whisper_service,
+    get_tts_service,
+    get_hotword_service,
+    encode_wav_audio,
     TranscriptionResult,
     TTSResult,
 )
@@ -37,6 +39,7 @@ async def transcribe_audio(
     match_id: Optional[int] = Form(default=None),
     language: str = Form(default="sv"),
     db: Session = Depends(get_database_session),
+    whisper_service: WhisperService = Depends(get_whisper_service),
 ) -> VoiceTranscriptionResponse:
     """Transcribe audio file to text using Whisper."""
     start_time = time.time()
@@ -123,75 +126,43 @@ async def transcribe_audio(
         raise HTTPException(status_code=500, detail="Failed to transcribe audio")
 
 
-@router.post("/speak", response_model=TTSResponse)
-async def text_to_speech(
-    text: str = Form(...),
-    voice: str = Form(default="default"),
-    speed: float = Form(default=1.0, ge=0.5, le=2.0),
-    db: Session = Depends(get_database_session),
-) -> TTSResponse:
-    """Convert text to speech using TTS engine."""
+async def _synthesize_and_log(
+    text: str,
+    voice: str,
+    speed: float,
+    db: Session,
+    tts_service: KokoroTTSService,
+) -> TTSResult:
+    """Synthesize speech for a TTS route and record the outcome in the processing log."""
     start_time = time.time()
 
     try:
         logger.info(f"Converting text to speech: {text[:50]}...")
 
         # Synthesize speech using Kokoro TTS
-        try:
-            result = await tts_service.synthesize_speech(
-                text=text,
-                voice=voice,
-                speed=speed
-            )
-
-            # Save audio to temporary file
-            import tempfile
-            with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as temp_file:
-                temp_file.write(result.audio_data)
-                audio_file_path = temp_file.name
-
-            # Log successful processing
-            log_entry = VoiceProcessingLog(
-                operation_type="tts",
-                status="success",
-                input_data=text[:500],
-                output_data=audio_file_path,
-                processing_time_ms=int(result.processing_time * 1000),
-                output_file_path=audio_file_path,
-            )
-            db.add(log_entry)
-            db.commit()
-
-            logger.info(f"TTS synthesis completed: {result.duration:.2f}s audio")
-
-            return TTSResponse(
-                message="Text converted to speech successfully",
-                audio_url=audio_file_path,
-                duration=result.duration,
-                voice_used=voice,
-                speed_used=speed
-            )
+        result = await tts_service.synthesize_speech(
+            text=text,
+            voice=voice,
+            speed=speed
+        )
 
-        except VoiceProcessingError as e:
-            # Log failed processing
-            log_entry = VoiceProcessingLog(
-                operation_type="tts",
-                status="error",
-                input_data=text[:500],
-                error_message=str(e),
-                processing_time_ms=int((time.time() - start_time) * 1000),
-            )
-            db.add(log_entry)
-            db.commit()
+        # Log successful processing
+        log_entry = VoiceProcessingLog(
+            operation_type="tts",
+            status="success",
+            input_data=text[:500],
+            processing_time_ms=int(result.processing_time * 1000),
+        )
+        db.add(log_entry)
+        db.commit()
 
-            raise HTTPException(status_code=500, detail=str(e))
+        logger.info(f"TTS synthesis completed: {result.duration:.2f}s audio")
+        return result
 
-    except HTTPException:
-        raise
     except Exception as e:
         logger.error(f"Error converting text to speech: {e}")
 
-        # Log unexpected error
+        # Log failed processing
         log_entry = VoiceProcessingLog(
             operation_type="tts",
             status="error",
@@ -202,12 +173,80 @@ async def text_to_speech(
         db.add(log_entry)
         db.commit()
 
+        if isinstance(e, VoiceProcessingError):
+            raise HTTPException(status_code=500, detail=str(e))
         raise HTTPException(status_code=500, detail="Failed to convert text to speech")
 
 
+@router.post("/speak", response_model=TTSResponse)
+async def text_to_speech(
+    request: Request,
+    text: str = Form(...),
+    voice: str = Form(default="default"),
+    speed: float = Form(default=1.0, ge=0.5, le=2.0),
+    db: Session = Depends(get_database_session),
+    tts_service: KokoroTTSService = Depends(get_tts_service),
+) -> TTSResponse:
+    """Convert text to speech using TTS engine."""
+    result = await _synthesize_and_log(text, voice, speed, db, tts_service)
+
+    # Keep the rendering in memory for a later GET instead of writing a file per request
+    audio_id = tts_service.store_audio(result)
+
+    return TTSResponse(
+        message="Text converted to speech successfully",
+        audio_url=request.url_for("get_speech_audio", audio_id=audio_id).path,
+        duration=result.duration,
+        voice_used=voice,
+        speed_used=speed
+    )
+
+
+@router.post(
+    "/speak/audio",
+    response_class=Response,
+    responses={200: {"content": {"audio/wav": {}}}},
+)
+async def text_to_speech_audio(
+    text: str = Form(...),
+    voice: str = Form(default="default"),
+    speed: float = Form(default=1.0, ge=0.5, le=2.0),
+    db: Session = Depends(get_database_session),
+    tts_service: KokoroTTSService = Depends(get_tts_service),
+) -> Response:
+    """Convert text to speech and return the WAV audio in the response body."""
+    result = await _synthesize_and_log(text, voice, speed, db, tts_service)
+
+    return Response(
+        content=encode_wav_audio(result.audio_data, result.sample_rate),
+        media_type="audio/wav",
+    )
+
+
+@router.get(
+    "/speak/audio/{audio_id}",
+    response_class=Response,
+    responses={200: {"content": {"audio/wav": {}}}},
+)
+async def get_speech_audio(
+    audio_id: str,
+    tts_service: KokoroTTSService = Depends(get_tts_service),
+) -> Response:
+    """Download the WAV audio of a rendering returned by /speak."""
+    result = tts_service.get_stored_audio(audio_id)
+    if result is None:
+        raise HTTPException(status_code=404, detail="Audio not found or expired")
+
+    return Response(
+        content=encode_wav_audio(result.audio_data, result.sample_rate),
+        media_type="audio/wav",
+    )
+
+
 @router.get("/hotword/status", response_model=HotwordStatusResponse)
 async def get_hotword_status(
     db: Session = Depends(get_database_session),
+    hotword_service: PorcupineHotwordService = Depends(get_hotword_service),
 ) -> HotwordStatusResponse:
     """Get current hotword detection status."""
     try:
@@ -255,6 +294,7 @@ async def start_hotword_detection(
     keywords: str = Form(default="referee,domare"),
     sensitivity: float = Form(default=None),
     db: Session = Depends(get_database_session),
+    hotword_service: PorcupineHotwordService = Depends(get_hotword_service),
 ) -> dict:
     """Start hotword detection service."""
     try:
@@ -304,7 +344,9 @@ async def start_hotword_detection(
 
 
 @router.post("/hotword/stop")
-async def stop_hotword_detection() -> dict:
+async def stop_hotword_detection(
+    hotword_service: PorcupineHotwordService = Depends(get_hotword_service),
+) -> dict:
     """Stop hotword detection service."""
     try:
         logger.info("Stopping hotword detection")
@@ -39,6 +39,7 @@ class Settings(BaseSettings):
         default="https://fogis.svenskfotboll.se",
         env="FOGIS_BASE_URL"
     )
+    FOGIS_TIMEOUT_SECONDS: float = Field(default=30.0, env="FOGIS_TIMEOUT_SECONDS")
     
     # Voice Processing Configuration
     HOTWORD_SENSITIVITY: float = Field(default=0.5, env="HOTWORD_SENSITIVITY")
@@ -48,6 +49,7 @@ class Settings(BaseSettings):
     )
     WHISPER_MODEL_SIZE: str = Field(default="base", env="WHISPER_MODEL_SIZE")
     WHISPER_LANGUAGE: str = Field(default="sv", env="WHISPER_LANGUAGE")
+    WHISPER_DEVICE: Optional[str] = Field(default=None, env="WHISPER_DEVICE")
     AUDIO_SAMPLE_RATE: int = Field(default=16000, env="AUDIO_SAMPLE_RATE")
     AUDIO_CHUNK_SIZE: int = Field(default=1024, env="AUDIO_CHUNK_SIZE")
     
@@ -2,7 +2,9 @@
 Database session management and utilities.
 """
 
-from typing import Generator, Optional
+import asyncio
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Generator, Optional
 from sqlalchemy import create_engine, Engine
 from sqlalchemy.orm import sessionmaker, Session
 from sqlalchemy.pool import StaticPool
@@ -85,6 +87,45 @@ class DatabaseManager:
         finally:
             session.close()
     
+    @asynccontextmanager
+    async def async_session(self) -> AsyncIterator[Session]:
+        """
+        Provide a session that commits on success and rolls back on error.
+        
+        Connection checkout and commit run in a worker thread so waiting on
+        the pool or the database does not block the event loop. Objects are
+        not expired on commit so they stay usable after the block exits.
+        """
+        if not self.SessionLocal:
+            raise RuntimeError("Database not initialized. Call initialize() first.")
+        
+        session = self.SessionLocal(expire_on_commit=False)
+        try:
+            await asyncio.to_thread(session.connection)
+            yield session
+            await asyncio.to_thread(session.commit)
+        except Exception as e:
+            logger.error(f"Database session error: {e}")
+            session.rollback()
+            raise
+        finally:
+            session.close()
+    
+    @asynccontextmanager
+    async def connection_released(self, session: Session) -> AsyncIterator[None]:
+        """
+        Commit a session and hand its connection back to the pool for the block.
+        
+        Long-lived sessions wrap network awaits in this so no connection or
+        open transaction is held while waiting on a remote service. The
+        session stays usable and checks a connection out again on exit.
+        """
+        await asyncio.to_thread(session.commit)
+        try:
+            yield
+        finally:
+            await asyncio.to_thread(session.connection)
+    
     def health_check(self) -> bool:
         """Check database connectivity."""
         try:
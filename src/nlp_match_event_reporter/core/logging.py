@@ -28,13 +28,15 @@ def setup_logging() -> None:
             "<level>{message}</level>"
         )
 
-    # Add console handler
+    # Add console handler; outside tests, writes go through a queue to a
+    # worker thread so logging never blocks the event loop
     logger.add(
         sys.stdout,
         format=log_format,
         level=settings.LOG_LEVEL,
         colorize=not settings.TESTING and settings.LOG_FORMAT != "json",
         serialize=False,  # Disable serialization to avoid format issues
+        enqueue=not settings.TESTING,
     )
 
     # Add file handler if specified
@@ -46,6 +48,7 @@ def setup_logging() -> None:
             rotation="10 MB",
             retention="30 days",
             compression="gz",
+            enqueue=True,
         )
 
 
@@ -0,0 +1,51 @@
+"""
+Helpers for running periodic background work.
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable
+
+from loguru import logger
+
+
+async def run_periodic(
+    work: Callable[[], Awaitable[Any]],
+    interval: float,
+    should_continue: Callable[[], bool],
+    error_delay: float,
+    name: str,
+) -> None:
+    """
+    Run ``work`` every ``interval`` seconds on a fixed cadence.
+
+    Deadlines are measured from the start of each run, so the time spent
+    working does not push later runs back. A run that overshoots its
+    deadline by more than a whole interval is logged and the missed runs
+    are skipped instead of being executed back to back.
+
+    Args:
+        work: Coroutine function performing one iteration
+        interval: Seconds between the starts of consecutive runs
+        should_continue: Checked before each run; the loop exits when False
+        error_delay: Seconds to wait after a failed run before trying again
+        name: Name used in log messages
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time()
+
+    while should_continue():
+        deadline += interval
+        try:
+            await work()
+        except Exception as e:
+            logger.error(f"Error in {name} loop: {e}")
+            await asyncio.sleep(error_delay)
+            deadline = loop.time()
+            continue
+
+        overrun = loop.time() - deadline
+        if overrun > interval:
+            logger.warning(f"{name} run overran its interval by {overrun:.1f}s, skipping missed runs")
+            deadline = loop.time()
+        elif overrun < 0:
+            await asyncio.sleep(-overrun)
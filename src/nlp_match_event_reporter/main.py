@@ -73,6 +73,9 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
 
     close_database()
 
+    # Flush log messages still queued for the logging worker
+    await logger.complete()
+
 
 # Create FastAPI application
 app = FastAPI(
@@ -69,6 +69,9 @@ class Match(Base, TimestampMixin):
     reporting_started_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
     reporting_ended_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
     
+    # Hash of the FOGIS fields at last sync, used to skip unchanged matches
+    version_hash: Mapped[Optional[str]] = mapped_column(String(16))
+    
     # Relationships
     events: Mapped[List["Event"]] = relationship("Event", back_populates="match", cascade="all, delete-orphan")
     
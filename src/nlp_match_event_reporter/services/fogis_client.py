@@ -3,9 +3,11 @@ FOGIS API client for fetching match data and syncing events.
 """
 
 import asyncio
+import json
+import sys
 import time
 from datetime import datetime, timezone
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, AsyncIterator, Tuple
 from dataclasses import dataclass
 
 import httpx
@@ -13,11 +15,44 @@ from loguru import logger
 
 from ..core.config import settings
 from ..core.exceptions import FOGISIntegrationError
-
-
-@dataclass
+from ..core.scheduling import run_periodic
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - optional speedup
+    msgpack = None
+
+try:
+    import ciso8601
+except ImportError:  # pragma: no cover - optional speedup
+    ciso8601 = None
+
+JSON_CONTENT_TYPE = "application/json"
+MSGPACK_CONTENT_TYPE = "application/x-msgpack"
+
+# Short-lived cache for single match lookups
+MATCH_CACHE_TTL_SECONDS = 30.0
+MATCH_CACHE_MAXSIZE = 256
+_CACHE_MISS = object()
+
+# Consecutive 5xx batch responses before batch sync is short-circuited
+BREAKER_FAILURE_THRESHOLD = 5
+BREAKER_RESET_SECONDS = 30.0
+
+if ciso8601 is not None:
+    _parse_iso = ciso8601.parse_datetime
+elif sys.version_info >= (3, 11):
+    # fromisoformat accepts the "Z" suffix natively from 3.11 onwards
+    _parse_iso = datetime.fromisoformat
+else:  # pragma: no cover - legacy interpreters
+    def _parse_iso(value: str) -> datetime:
+        """Parse an ISO 8601 timestamp that may use the "Z" suffix."""
+        return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
+@dataclass(frozen=True)
 class FOGISMatch:
-    """FOGIS match data structure."""
+    """FOGIS match data structure, immutable so instances can be shared and cached."""
     match_id: int
     home_team: str
     away_team: str
@@ -58,16 +93,81 @@ class FOGISSyncResult:
     attempts: int
 
 
+def _match_from_dict(match_data: Dict[str, Any]) -> FOGISMatch:
+    """Build a FOGISMatch from a FOGIS API match payload."""
+    return FOGISMatch(
+        match_id=match_data["match_id"],
+        home_team=match_data["home_team"],
+        away_team=match_data["away_team"],
+        home_team_id=match_data["home_team_id"],
+        away_team_id=match_data["away_team_id"],
+        match_date=_parse_iso(match_data["match_date"]),
+        venue=match_data["venue"],
+        competition=match_data["competition"],
+        status=match_data["status"],
+        referee_id=match_data.get("referee_id"),
+        referee_name=match_data.get("referee_name")
+    )
+
+
+# Placeholder FOGIS data, built once at import
+_MOCK_MATCHES: Tuple[FOGISMatch, ...] = tuple(
+    _match_from_dict(match_data) for match_data in (
+        {
+            "match_id": 123456,
+            "home_team": "AIK",
+            "away_team": "Hammarby",
+            "home_team_id": 1001,
+            "away_team_id": 1002,
+            "match_date": "2025-08-20T19:00:00Z",
+            "venue": "Friends Arena",
+            "competition": "Allsvenskan",
+            "status": "scheduled",
+            "referee_id": 5001,
+            "referee_name": "Test Referee"
+        },
+        {
+            "match_id": 123457,
+            "home_team": "Djurgården",
+            "away_team": "IFK Göteborg",
+            "home_team_id": 1003,
+            "away_team_id": 1004,
+            "match_date": "2025-08-21T15:00:00Z",
+            "venue": "Tele2 Arena",
+            "competition": "Allsvenskan",
+            "status": "scheduled",
+            "referee_id": 5002,
+            "referee_name": "Another Referee"
+        },
+    )
+)
+_MOCK_MATCH_BY_ID: Dict[int, FOGISMatch] = {match.match_id: match for match in _MOCK_MATCHES}
+
+
 class FOGISClient:
     """Client for interacting with FOGIS API."""
     
-    def __init__(self):
-        """Initialize FOGIS client."""
+    def __init__(self, transport: Optional[httpx.AsyncBaseTransport] = None):
+        """
+        Initialize FOGIS client.
+        
+        Args:
+            transport: Optional httpx transport for the session, e.g. a mock in tests
+        """
         self.base_url = settings.FOGIS_BASE_URL
-        self.timeout = 30.0
+        self._transport = transport
+        self.timeout = settings.FOGIS_TIMEOUT_SECONDS
         self._session: Optional[httpx.AsyncClient] = None
         self._authenticated = False
         self._auth_token: Optional[str] = None
+        # Unknown until the first FOGIS response tells us
+        self._server_supports_msgpack: Optional[bool] = None
+        self._server_supports_batch: Optional[bool] = None
+        self._batch_server_errors = 0
+        self._breaker_open_until = 0.0
+        # match_id -> (expires_at, match), in insertion order for eviction
+        self._match_cache: Dict[int, Tuple[float, Optional[FOGISMatch]]] = {}
+        self._match_locks: Dict[int, asyncio.Lock] = {}
     
     async def __aenter__(self):
         """Async context manager entry."""
@@ -84,16 +184,86 @@ class FOGISClient:
             self._session = httpx.AsyncClient(
                 base_url=self.base_url,
                 timeout=self.timeout,
+                transport=self._transport,
                 headers={
                     "User-Agent": "NLP-Match-Event-Reporter/1.0",
-                    "Accept": "application/json",
-                    "Content-Type": "application/json",
+                    "Accept": self._accept_header(),
+                    "Content-Type": JSON_CONTENT_TYPE,
                 }
             )
             logger.info(f"FOGIS client initialized with base URL: {self.base_url}")
     
+    def _accept_header(self) -> str:
+        """Build the Accept header, preferring msgpack when it can be decoded."""
+        if msgpack is not None and self._server_supports_msgpack is not False:
+            return f"{MSGPACK_CONTENT_TYPE}, {JSON_CONTENT_TYPE};q=0.8"
+        return JSON_CONTENT_TYPE
+    
+    def _encode_payload(self, data: Dict[str, Any]) -> Tuple[bytes, str]:
+        """
+        Serialize a request payload in the best format FOGIS supports.
+        
+        Returns:
+            Tuple of (body bytes, content type)
+        """
+        if msgpack is not None and self._server_supports_msgpack:
+            return (
+                msgpack.packb(data, use_bin_type=True, datetime=True),
+                MSGPACK_CONTENT_TYPE,
+            )
+        return json.dumps(data).encode("utf-8"), JSON_CONTENT_TYPE
+    
+    def _decode_response(self, response: httpx.Response) -> Any:
+        """
+        Decode a FOGIS response body based on its Content-Type.
+        
+        The first response also records whether FOGIS speaks msgpack, so
+        later request bodies use it too.
+        """
+        content_type = response.headers.get("Content-Type", "")
+        is_msgpack = content_type.startswith(MSGPACK_CONTENT_TYPE)
+        if self._server_supports_msgpack is None:
+            self._set_msgpack_support(is_msgpack)
+        
+        if is_msgpack and msgpack is not None:
+            return msgpack.unpackb(response.content, timestamp=3)
+        return response.json()
+    
+    def _set_msgpack_support(self, supported: bool) -> None:
+        """Remember msgpack support and update the session Accept header."""
+        self._server_supports_msgpack = supported
+        if self._session:
+            self._session.headers["Accept"] = self._accept_header()
+    
+    async def _send(self, method: str, url: str, data: Dict[str, Any]) -> httpx.Response:
+        """
+        Send a request body in the negotiated wire format.
+        
+        A 406 Not Acceptable makes the client fall back to plain JSON and
+        retry once. Other error statuses raise httpx.HTTPStatusError.
+        """
+        if self._session is None:
+            await self.initialize()
+        
+        body, content_type = self._encode_payload(data)
+        response = await self._session.request(
+            method, url, content=body, headers={"Content-Type": content_type}
+        )
+        
+        if response.status_code == 406 and self._server_supports_msgpack is not False:
+            logger.warning("FOGIS rejected msgpack, falling back to JSON")
+            self._set_msgpack_support(False)
+            body, content_type = self._encode_payload(data)
+            response = await self._session.request(
+                method, url, content=body, headers={"Content-Type": content_type}
+            )
+        
+        response.raise_for_status()
+        return response
+    
     async def close(self) -> None:
         """Close the HTTP session."""
+        self.clear_match_cache()
         if self._session:
             await self._session.aclose()
             self._session = None
@@ -164,11 +334,48 @@ class FOGISClient:
         Returns:
             List of FOGIS matches
         """
+        matches = [
+            match
+            async for match in self.iter_matches(
+                date_from=date_from,
+                date_to=date_to,
+                competition_id=competition_id,
+                team_id=team_id,
+                limit=limit,
+            )
+        ]
+        logger.info("Fetched {} matches from FOGIS", len(matches))
+        return matches
+    
+    async def iter_matches(
+        self,
+        date_from: Optional[datetime] = None,
+        date_to: Optional[datetime] = None,
+        competition_id: Optional[int] = None,
+        team_id: Optional[int] = None,
+        limit: int = 100
+    ) -> AsyncIterator[FOGISMatch]:
+        """
+        Stream matches from FOGIS API one at a time.
+        
+        Matches are yielded as soon as each item has been decoded, so the
+        full response body never has to be buffered in memory.
+        
+        Args:
+            date_from: Start date filter
+            date_to: End date filter
+            competition_id: Competition filter
+            team_id: Team filter
+            limit: Maximum number of matches
+        
+        Yields:
+            FOGIS matches
+        """
         if not self._authenticated:
             raise FOGISIntegrationError("Not authenticated with FOGIS")
         
         try:
-            logger.info(f"Fetching matches from FOGIS (limit: {limit})")
+            logger.info("Fetching matches from FOGIS (limit: {})", limit)
             
             # Build query parameters
             params = {"limit": limit}
@@ -182,59 +389,15 @@ class FOGISClient:
                 params["team_id"] = team_id
             
             # Note: This is a placeholder implementation
-            # In a real implementation, you would make actual API calls
+            # In a real implementation, you would stream the response with
+            # `self._session.stream("GET", "/matches", params=params)` and
+            # decode the items of the "matches" array incrementally from
+            # `resp.aiter_bytes()` instead of calling `resp.json()`
             await asyncio.sleep(0.2)  # Simulate API call
             
-            # Mock response data
-            mock_matches = [
-                {
-                    "match_id": 123456,
-                    "home_team": "AIK",
-                    "away_team": "Hammarby",
-                    "home_team_id": 1001,
-                    "away_team_id": 1002,
-                    "match_date": "2025-08-20T19:00:00Z",
-                    "venue": "Friends Arena",
-                    "competition": "Allsvenskan",
-                    "status": "scheduled",
-                    "referee_id": 5001,
-                    "referee_name": "Test Referee"
-                },
-                {
-                    "match_id": 123457,
-                    "home_team": "Djurgården",
-                    "away_team": "IFK Göteborg",
-                    "home_team_id": 1003,
-                    "away_team_id": 1004,
-                    "match_date": "2025-08-21T15:00:00Z",
-                    "venue": "Tele2 Arena",
-                    "competition": "Allsvenskan",
-                    "status": "scheduled",
-                    "referee_id": 5002,
-                    "referee_name": "Another Referee"
-                }
-            ]
-            
-            # Convert to FOGISMatch objects
-            matches = []
-            for match_data in mock_matches:
-                match = FOGISMatch(
-                    match_id=match_data["match_id"],
-                    home_team=match_data["home_team"],
-                    away_team=match_data["away_team"],
-                    home_team_id=match_data["home_team_id"],
-                    away_team_id=match_data["away_team_id"],
-                    match_date=datetime.fromisoformat(match_data["match_date"].replace("Z", "+00:00")),
-                    venue=match_data["venue"],
-                    competition=match_data["competition"],
-                    status=match_data["status"],
-                    referee_id=match_data.get("referee_id"),
-                    referee_name=match_data.get("referee_name")
-                )
-                matches.append(match)
-            
-            logger.info(f"Fetched {len(matches)} matches from FOGIS")
-            return matches
+            # Yield mock matches one at a time
+            for match in _MOCK_MATCHES[:limit]:
+                yield match
             
         except Exception as e:
             logger.error(f"Error fetching matches from FOGIS: {e}")
@@ -249,50 +412,67 @@ class FOGISClient:
         
         Returns:
             FOGISMatch object or None if not found
+        
+        Results, including "not found", are cached for
+        MATCH_CACHE_TTL_SECONDS so repeated lookups within a sync cycle
+        reach FOGIS only once.
         """
         if not self._authenticated:
             raise FOGISIntegrationError("Not authenticated with FOGIS")
         
+        match = self._cached_match(match_id)
+        if match is not _CACHE_MISS:
+            return match
+        
+        # One fetch per match ID; concurrent callers wait for its result
+        lock = self._match_locks.setdefault(match_id, asyncio.Lock())
+        try:
+            async with lock:
+                match = self._cached_match(match_id)
+                if match is _CACHE_MISS:
+                    # A failed fetch raises before anything is cached
+                    match = await self._fetch_match(match_id)
+                    if len(self._match_cache) >= MATCH_CACHE_MAXSIZE:
+                        # Evict the oldest entry
+                        del self._match_cache[next(iter(self._match_cache))]
+                    self._match_cache[match_id] = (time.monotonic() + MATCH_CACHE_TTL_SECONDS, match)
+        finally:
+            self._match_locks.pop(match_id, None)
+        return match
+    
+    def _cached_match(self, match_id: int) -> Any:
+        """Get a cached match, or _CACHE_MISS if absent or expired."""
+        entry = self._match_cache.get(match_id)
+        if entry is None:
+            return _CACHE_MISS
+        expires_at, match = entry
+        if expires_at <= time.monotonic():
+            del self._match_cache[match_id]
+            return _CACHE_MISS
+        return match
+    
+    def invalidate_match(self, match_id: int) -> None:
+        """Drop a cached match so the next lookup fetches it from FOGIS."""
+        self._match_cache.pop(match_id, None)
+    
+    def clear_match_cache(self) -> None:
+        """Drop all cached matches."""
+        self._match_cache.clear()
+    
+    async def _fetch_match(self, match_id: int) -> Optional[FOGISMatch]:
+        """Fetch a specific match from FOGIS API, bypassing the cache."""
         try:
-            logger.info(f"Fetching match {match_id} from FOGIS")
+            logger.debug("Fetching match {} from FOGIS", match_id)
             
             # Note: This is a placeholder implementation
             await asyncio.sleep(0.1)  # Simulate API call
             
             # Mock response - return None for non-existent matches
-            if match_id == 999999:
+            match = _MOCK_MATCH_BY_ID.get(match_id)
+            if match is None:
                 return None
             
-            # Mock match data
-            match_data = {
-                "match_id": match_id,
-                "home_team": "AIK",
-                "away_team": "Hammarby",
-                "home_team_id": 1001,
-                "away_team_id": 1002,
-                "match_date": "2025-08-20T19:00:00Z",
-                "venue": "Friends Arena",
-                "competition": "Allsvenskan",
-                "status": "scheduled",
-                "referee_id": 5001,
-                "referee_name": "Test Referee"
-            }
-            
-            match = FOGISMatch(
-                match_id=match_data["match_id"],
-                home_team=match_data["home_team"],
-                away_team=match_data["away_team"],
-                home_team_id=match_data["home_team_id"],
-                away_team_id=match_data["away_team_id"],
-                match_date=datetime.fromisoformat(match_data["match_date"].replace("Z", "+00:00")),
-                venue=match_data["venue"],
-                competition=match_data["competition"],
-                status=match_data["status"],
-                referee_id=match_data.get("referee_id"),
-                referee_name=match_data.get("referee_name")
-            )
-            
-            logger.info(f"Fetched match {match_id} from FOGIS")
+            logger.info("Fetched match {} from FOGIS", match_id)
             return match
             
         except Exception as e:
@@ -330,7 +510,7 @@ class FOGISClient:
             raise FOGISIntegrationError("Not authenticated with FOGIS")
         
         try:
-            logger.info(f"Syncing event to FOGIS: {event_type} at minute {minute}")
+            logger.debug("Syncing event to FOGIS: {} at minute {}", event_type, minute)
             
             event_data = {
                 "match_id": match_id,
@@ -356,9 +536,21 @@ class FOGISClient:
                 attempts=1
             )
             
-            logger.info(f"Event synced to FOGIS with ID: {sync_result.event_id}")
+            self.invalidate_match(match_id)
+            logger.info("Event synced to FOGIS with ID: {}", sync_result.event_id)
             return sync_result
             
+        except httpx.HTTPStatusError as e:
+            logger.error(f"FOGIS rejected event sync: {e}")
+            
+            # Lead with the status code so callers can tell permanent failures apart
+            return FOGISSyncResult(
+                success=False,
+                event_id=None,
+                message=f"{e.response.status_code} {e.response.reason_phrase}",
+                sync_time=datetime.now(timezone.utc),
+                attempts=1
+            )
         except Exception as e:
             logger.error(f"Error syncing event to FOGIS: {e}")
             
@@ -371,6 +563,99 @@ class FOGISClient:
                 attempts=1
             )
     
+    async def sync_events_batch(
+        self,
+        events: List[Dict[str, Any]]
+    ) -> List[FOGISSyncResult]:
+        """
+        Sync several events to FOGIS in a single request.
+        
+        Falls back to one request per event when FOGIS has no batch
+        endpoint, and stops calling it for a while after repeated 5xx
+        responses.
+        
+        Args:
+            events: Event payloads with the same keys as sync_event arguments
+        
+        Returns:
+            One FOGISSyncResult per event, in input order
+        """
+        if not self._authenticated:
+            raise FOGISIntegrationError("Not authenticated with FOGIS")
+        
+        if self._server_supports_batch is False:
+            return [await self.sync_event(**event) for event in events]
+        
+        if time.monotonic() < self._breaker_open_until:
+            raise FOGISIntegrationError("FOGIS batch sync circuit breaker is open")
+        
+        try:
+            logger.info("Syncing {} events to FOGIS in one batch", len(events))
+            
+            timestamp = datetime.now(timezone.utc).isoformat()
+            payload = {
+                "events": [{**event, "timestamp": timestamp} for event in events]
+            }
+            response_items = await self._post_events_batch(payload)
+            
+            self._server_supports_batch = True
+            self._batch_server_errors = 0
+            for match_id in {event["match_id"] for event in events}:
+                self.invalidate_match(match_id)
+            
+            sync_time = datetime.now(timezone.utc)
+            return [
+                FOGISSyncResult(
+                    success=item.get("success", False),
+                    event_id=item.get("event_id"),
+                    message=item.get("message", ""),
+                    sync_time=sync_time,
+                    attempts=1
+                )
+                for item in response_items
+            ]
+            
+        except httpx.HTTPStatusError as e:
+            status_code = e.response.status_code
+            if status_code in (404, 405):
+                logger.warning("FOGIS has no batch event endpoint, falling back to per-event sync")
+                self._server_supports_batch = False
+                return [await self.sync_event(**event) for event in events]
+            
+            if status_code >= 500:
+                self._batch_server_errors += 1
+                if self._batch_server_errors >= BREAKER_FAILURE_THRESHOLD:
+                    logger.warning(
+                        f"Opening FOGIS batch sync circuit breaker for {BREAKER_RESET_SECONDS}s "
+                        f"after {self._batch_server_errors} server errors"
+                    )
+                    self._breaker_open_until = time.monotonic() + BREAKER_RESET_SECONDS
+                    # Start counting afresh once the cool-down ends
+                    self._batch_server_errors = 0
+            
+            logger.error(f"FOGIS rejected batch event sync: {e}")
+            message = f"{status_code} {e.response.reason_phrase}"
+        except Exception as e:
+            logger.error(f"Error batch syncing events to FOGIS: {e}")
+            message = f"Sync failed: {e}"
+        
+        sync_time = datetime.now(timezone.utc)
+        return [
+            FOGISSyncResult(
+                success=False,
+                event_id=None,
+                message=message,
+                sync_time=sync_time,
+                attempts=1
+            )
+            for _ in events
+        ]
+    
+    async def _post_events_batch(self, payload: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """POST a batch of events to FOGIS and return the per-event results."""
+        response = await self._send("POST", "/events:batch", payload)
+        return self._decode_response(response)["results"]
+    
     async def health_check(self) -> bool:
         """
         Check FOGIS API health.
@@ -417,15 +702,27 @@ async def cleanup_fogis_client() -> None:
 
 
 # Utility functions
-def convert_event_to_fogis_format(event_data: Dict[str, Any]) -> Dict[str, Any]:
-    """Convert internal event format to FOGIS format."""
+def convert_event_to_fogis_format(
+    event_data: Dict[str, Any],
+    timestamp: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Convert internal event format to FOGIS format.
+    
+    Args:
+        event_data: Internal event data
+        timestamp: Pre-formatted ISO timestamp shared by a batch of
+            conversions; defaults to the current UTC time
+    """
+    if timestamp is None:
+        timestamp = datetime.now(timezone.utc).isoformat()
     return {
         "event_type": event_data.get("event_type"),
         "minute": event_data.get("minute"),
         "description": event_data.get("description"),
         "player_name": event_data.get("player_name"),
         "team": event_data.get("team"),
-        "timestamp": datetime.now(timezone.utc).isoformat()
+        "timestamp": timestamp
     }
 
 
@@ -454,7 +751,7 @@ class FOGISSyncService:
         self.client = fogis_client
         self._sync_task: Optional[asyncio.Task] = None
         self._is_running = False
-        self._sync_interval = 30.0  # seconds
+        self._sync_interval = float(settings.SYNC_INTERVAL_SECONDS)
 
     async def start_background_sync(self) -> None:
         """Start background synchronization task."""
@@ -485,15 +782,13 @@ class FOGISSyncService:
     async def _sync_loop(self) -> None:
         """Background sync loop."""
         try:
-            while self._is_running:
-                try:
-                    await self._sync_pending_events()
-                    await asyncio.sleep(self._sync_interval)
-                except asyncio.CancelledError:
-                    break
-                except Exception as e:
-                    logger.error(f"Error in FOGIS sync loop: {e}")
-                    await asyncio.sleep(5.0)  # Wait before retrying
+            await run_periodic(
+                self._sync_pending_events,
+                self._sync_interval,
+                lambda: self._is_running,
+                error_delay=5.0,
+                name="FOGIS sync"
+            )
         except asyncio.CancelledError:
             logger.info("FOGIS sync loop cancelled")
 
@@ -3,16 +3,62 @@ Service for synchronizing match data between FOGIS and local database.
 """
 
 import asyncio
+import hashlib
+import json
+import random
 from datetime import datetime, timezone, timedelta
-from typing import List, Optional, Dict, Any
+from typing import AsyncIterable, AsyncIterator, List, Optional, Dict, Any, Tuple
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 
 from loguru import logger
 
 from ..core.database import db_manager
 from ..models.database import Match, Event
-from ..services.fogis_client import fogis_client, FOGISMatch, convert_fogis_match_to_internal
+from ..services.fogis_client import (
+    fogis_client,
+    FOGISMatch,
+    FOGISSyncResult,
+    convert_fogis_match_to_internal,
+)
 from ..core.exceptions import FOGISIntegrationError
+from ..core.scheduling import run_periodic
+
+# Number of matches upserted per database flush
+SYNC_BATCH_SIZE = 100
+
+# Exponential retry delays in seconds, capped at 30s
+_BACKOFF = tuple(min(30.0, 0.5 * (2 ** i)) for i in range(8))
+
+# FOGIS status codes that will fail again no matter how often we retry
+_PERMANENT_FAILURE_CODES = frozenset({"400", "401", "403", "404", "409", "422"})
+
+
+def _backoff_delay(attempt: int) -> float:
+    """Get the retry delay for a zero-based attempt with +/-20% jitter."""
+    return _BACKOFF[min(attempt, len(_BACKOFF) - 1)] * random.uniform(0.8, 1.2)
+
+
+async def _take_matches(matches: AsyncIterator[FOGISMatch], count: int) -> List[FOGISMatch]:
+    """Pull up to count matches from a FOGIS match stream."""
+    batch: List[FOGISMatch] = []
+    while len(batch) < count:
+        try:
+            batch.append(await matches.__anext__())
+        except StopAsyncIteration:
+            break
+    return batch
+
+
+def _match_version_hash(match_data: Dict[str, Any]) -> str:
+    """Hash the canonical form of converted match data for change detection."""
+    canonical = json.dumps(match_data, sort_keys=True, default=str).encode()
+    return hashlib.blake2b(canonical, digest_size=8).hexdigest()
+
+
+def _is_permanent_failure(message: str) -> bool:
+    """Check whether a FOGIS sync failure message carries a non-retryable status."""
+    return message[:3] in _PERMANENT_FAILURE_CODES
 
 
 class MatchSyncService:
@@ -27,6 +73,7 @@ class MatchSyncService:
     
     async def sync_matches_from_fogis(
         self,
+        db: Session,
         days_ahead: int = 7,
         days_behind: int = 1
     ) -> Dict[str, Any]:
@@ -34,6 +81,7 @@ class MatchSyncService:
         Sync matches from FOGIS to local database.
         
         Args:
+            db: Session of the sync pass
             days_ahead: Number of days ahead to sync
             days_behind: Number of days behind to sync
         
@@ -50,21 +98,19 @@ class MatchSyncService:
             
             # Authenticate if needed
             if not self.client._authenticated:
-                # In a real implementation, you would get credentials from config
-                await self.client.authenticate("username", "password")
+                async with db_manager.connection_released(db):
+                    # In a real implementation, you would get credentials from config
+                    await self.client.authenticate("username", "password")
             
-            # Fetch matches from FOGIS
-            fogis_matches = await self.client.get_matches(
+            # Stream matches from FOGIS straight into the database
+            fogis_matches = self.client.iter_matches(
                 date_from=date_from,
                 date_to=date_to,
                 limit=100
             )
             
             # Sync to database
-            sync_results = await self._sync_matches_to_db(fogis_matches)
-            
-            logger.info(f"Match sync completed: {sync_results}")
-            return sync_results
+            return await self._sync_matches_to_db(db, fogis_matches)
             
         except FOGISIntegrationError as e:
             logger.error(f"FOGIS integration error during match sync: {e}")
@@ -73,7 +119,8 @@ class MatchSyncService:
                 "error": str(e),
                 "matches_synced": 0,
                 "matches_updated": 0,
-                "matches_created": 0
+                "matches_created": 0,
+                "matches_unchanged": 0
             }
         except Exception as e:
             logger.error(f"Unexpected error during match sync: {e}")
@@ -82,73 +129,132 @@ class MatchSyncService:
                 "error": str(e),
                 "matches_synced": 0,
                 "matches_updated": 0,
-                "matches_created": 0
+                "matches_created": 0,
+                "matches_unchanged": 0
             }
     
-    async def _sync_matches_to_db(self, fogis_matches: List[FOGISMatch]) -> Dict[str, Any]:
-        """Sync FOGIS matches to database."""
+    async def _sync_matches_to_db(
+        self,
+        db: Session,
+        fogis_matches: AsyncIterable[FOGISMatch]
+    ) -> Dict[str, Any]:
+        """Sync FOGIS matches to database in batches as they arrive."""
+        matches_synced = 0
         matches_created = 0
         matches_updated = 0
+        matches_unchanged = 0
         errors = []
         
-        # Get database session
-        session_gen = db_manager.get_session()
-        db = next(session_gen)
-        
         try:
-            for fogis_match in fogis_matches:
-                try:
-                    # Check if match already exists
-                    existing_match = db.query(Match).filter(
-                        Match.fogis_match_id == fogis_match.match_id
-                    ).first()
-                    
-                    # Convert FOGIS match to internal format
-                    match_data = convert_fogis_match_to_internal(fogis_match)
-                    
-                    if existing_match:
-                        # Update existing match
-                        for key, value in match_data.items():
-                            if hasattr(existing_match, key):
-                                setattr(existing_match, key, value)
-                        matches_updated += 1
-                        logger.debug(f"Updated match {fogis_match.match_id}")
-                    else:
-                        # Create new match
-                        new_match = Match(**match_data)
-                        db.add(new_match)
-                        matches_created += 1
-                        logger.debug(f"Created match {fogis_match.match_id}")
+            matches = fogis_matches.__aiter__()
+            while True:
+                # Commits the previous batch and frees the connection while FOGIS streams the next
+                async with db_manager.connection_released(db):
+                    batch = await _take_matches(matches, SYNC_BATCH_SIZE)
+                if not batch:
+                    break
                 
-                except Exception as e:
-                    error_msg = f"Error syncing match {fogis_match.match_id}: {e}"
-                    logger.error(error_msg)
-                    errors.append(error_msg)
-            
-            # Commit all changes
-            db.commit()
+                created, updated, unchanged = self._upsert_match_batch(db, batch, errors)
+                matches_synced += len(batch)
+                matches_created += created
+                matches_updated += updated
+                matches_unchanged += unchanged
             
             return {
                 "success": True,
-                "matches_synced": len(fogis_matches),
+                "matches_synced": matches_synced,
                 "matches_created": matches_created,
                 "matches_updated": matches_updated,
+                "matches_unchanged": matches_unchanged,
                 "errors": errors
             }
             
+        except FOGISIntegrationError:
+            raise
         except Exception as e:
-            db.rollback()
             logger.error(f"Database error during match sync: {e}")
+            # Drop the failed batch so the rest of the pass can use the session
+            db.rollback()
             return {
                 "success": False,
                 "error": str(e),
                 "matches_synced": 0,
                 "matches_created": 0,
                 "matches_updated": 0,
+                "matches_unchanged": 0,
                 "errors": errors
             }
-        finally:
-            db.close()
+    
+    def _upsert_match_batch(
+        self,
+        db: Session,
+        batch: List[FOGISMatch],
+        errors: List[str]
+    ) -> Tuple[int, int, int]:
+        """Insert new and update changed matches in one batch, then flush it."""
+        matches_created = 0
+        matches_updated = 0
+        matches_unchanged = 0
+        
+        # Compare content hashes first so unchanged matches are never loaded
+        known_hashes = dict(db.execute(
+            select(Match.fogis_match_id, Match.version_hash).where(
+                Match.fogis_match_id.in_([m.match_id for m in batch])
+            )
+        ).all())
+        
+        changed: Dict[int, Dict[str, Any]] = {}
+        for fogis_match in batch:
+            try:
+                # Convert FOGIS match to internal format
+                match_data = convert_fogis_match_to_internal(fogis_match)
+                match_data["version_hash"] = _match_version_hash(match_data)
+                
+                if known_hashes.get(fogis_match.match_id) == match_data["version_hash"]:
+                    matches_unchanged += 1
+                    continue
+                changed[fogis_match.match_id] = match_data
+            
+            except Exception as e:
+                error_msg = f"Error syncing match {fogis_match.match_id}: {e}"
+                logger.error(error_msg)
+                errors.append(error_msg)
+        
+        if not changed:
+            return matches_created, matches_updated, matches_unchanged
+        
+        # Load only the existing matches that need an UPDATE
+        existing_matches = {
+            match.fogis_match_id: match
+            for match in db.query(Match).filter(
+                Match.fogis_match_id.in_(list(changed))
+            )
+        }
+        
+        for match_id, match_data in changed.items():
+            try:
+                existing_match = existing_matches.get(match_id)
+                
+                if existing_match:
+                    # Update existing match
+                    for key, value in match_data.items():
+                        if hasattr(existing_match, key):
+                            setattr(existing_match, key, value)
+                    matches_updated += 1
+                    logger.trace("Updated match {}", match_id)
+                else:
+                    # Create new match
+                    db.add(Match(**match_data))
+                    matches_created += 1
+                    logger.trace("Created match {}", match_id)
+            
+            except Exception as e:
+                error_msg = f"Error syncing match {match_id}: {e}"
+                logger.error(error_msg)
+                errors.append(error_msg)
+        
+        db.flush()
+        return matches_created, matches_updated, matches_unchanged
     
     async def sync_event_to_fogis(
         self,
@@ -165,92 +271,55 @@ class MatchSyncService:
         Returns:
             Sync result
         """
-        session_gen = db_manager.get_session()
-        db = next(session_gen)
-        
         try:
-            # Get event from database
-            event = db.query(Event).filter(Event.id == event_id).first()
-            if not event:
-                return {
-                    "success": False,
-                    "error": f"Event {event_id} not found"
-                }
-            
-            # Skip if already synced
-            if event.synced_to_fogis:
-                return {
-                    "success": True,
-                    "message": "Event already synced",
-                    "fogis_event_id": event.fogis_event_id
-                }
-            
-            # Get match FOGIS ID
-            match = db.query(Match).filter(Match.id == event.match_id).first()
-            if not match or not match.fogis_match_id:
-                return {
-                    "success": False,
-                    "error": "Match not found or missing FOGIS ID"
+            # Read what FOGIS needs, then release the session before any network I/O
+            async with db_manager.async_session() as db:
+                # Get event from database
+                event = db.query(Event).filter(Event.id == event_id).first()
+                if not event:
+                    return {
+                        "success": False,
+                        "error": f"Event {event_id} not found"
+                    }
+                
+                # Skip if already synced
+                if event.synced_to_fogis:
+                    return {
+                        "success": True,
+                        "message": "Event already synced",
+                        "fogis_event_id": event.fogis_event_id
+                    }
+                
+                # Get match FOGIS ID
+                match = db.query(Match).filter(Match.id == event.match_id).first()
+                if not match or not match.fogis_match_id:
+                    return {
+                        "success": False,
+                        "error": "Match not found or missing FOGIS ID"
+                    }
+                
+                payload = {
+                    "match_id": match.fogis_match_id,
+                    "event_type": event.event_type,
+                    "minute": event.minute,
+                    "description": event.description,
+                    "player_name": event.player_name,
+                    "team": event.team
                 }
             
             # Authenticate if needed
             if not self.client._authenticated:
                 await self.client.authenticate("username", "password")
             
-            # Sync event to FOGIS
-            for attempt in range(retry_count):
-                try:
-                    sync_result = await self.client.sync_event(
-                        match_id=match.fogis_match_id,
-                        event_type=event.event_type,
-                        minute=event.minute,
-                        description=event.description,
-                        player_name=event.player_name,
-                        team=event.team
-                    )
-                    
-                    if sync_result.success:
-                        # Update event in database
-                        event.synced_to_fogis = True
-                        event.fogis_event_id = sync_result.event_id
-                        event.sync_attempts = attempt + 1
-                        event.last_sync_attempt = datetime.now(timezone.utc)
-                        event.sync_error = None
-                        
-                        db.commit()
-                        
-                        logger.info(f"Event {event_id} synced to FOGIS with ID {sync_result.event_id}")
-                        return {
-                            "success": True,
-                            "fogis_event_id": sync_result.event_id,
-                            "attempts": attempt + 1
-                        }
-                    else:
-                        logger.warning(f"FOGIS sync failed for event {event_id}: {sync_result.message}")
-                        
-                except Exception as e:
-                    logger.error(f"Attempt {attempt + 1} failed for event {event_id}: {e}")
-                    if attempt == retry_count - 1:
-                        # Final attempt failed, update error info
-                        event.sync_attempts = retry_count
-                        event.last_sync_attempt = datetime.now(timezone.utc)
-                        event.sync_error = str(e)
-                        db.commit()
-                        
-                        return {
-                            "success": False,
-                            "error": str(e),
-                            "attempts": retry_count
-                        }
-                    
-                    # Wait before retry
-                    await asyncio.sleep(2 ** attempt)  # Exponential backoff
+            result, updates = await self._push_event(event_id, payload, retry_count)
             
-            return {
-                "success": False,
-                "error": "All retry attempts failed",
-                "attempts": retry_count
-            }
+            if updates:
+                async with db_manager.async_session() as db:
+                    event = db.get(Event, event_id)
+                    for key, value in updates.items():
+                        setattr(event, key, value)
+            
+            return result
             
         except Exception as e:
             logger.error(f"Error syncing event {event_id} to FOGIS: {e}")
@@ -258,24 +327,150 @@ class MatchSyncService:
                 "success": False,
                 "error": str(e)
             }
-        finally:
-            db.close()
     
-    async def get_unsynced_events(self, limit: int = 50) -> List[Event]:
-        """Get events that haven't been synced to FOGIS."""
-        session_gen = db_manager.get_session()
-        db = next(session_gen)
+    async def _push_event(
+        self,
+        event_id: int,
+        payload: Dict[str, Any],
+        retry_count: int
+    ) -> Tuple[Dict[str, Any], Optional[Dict[str, Any]]]:
+        """Push one event to FOGIS with retries; returns the result and the event columns to update."""
+        for attempt in range(retry_count):
+            try:
+                sync_result = await self.client.sync_event(**payload)
+                
+                if sync_result.success:
+                    logger.info("Event {} synced to FOGIS with ID {}", event_id, sync_result.event_id)
+                    return {
+                        "success": True,
+                        "fogis_event_id": sync_result.event_id,
+                        "attempts": attempt + 1
+                    }, {
+                        "synced_to_fogis": True,
+                        "fogis_event_id": sync_result.event_id,
+                        "sync_attempts": attempt + 1,
+                        "last_sync_attempt": datetime.now(timezone.utc),
+                        "sync_error": None
+                    }
+                
+                logger.warning("FOGIS sync failed for event {}: {}", event_id, sync_result.message)
+                if _is_permanent_failure(sync_result.message):
+                    # Retrying a rejected event cannot succeed
+                    return {
+                        "success": False,
+                        "error": sync_result.message,
+                        "attempts": attempt + 1
+                    }, {
+                        "sync_attempts": attempt + 1,
+                        "last_sync_attempt": datetime.now(timezone.utc),
+                        "sync_error": sync_result.message
+                    }
+                    
+            except Exception as e:
+                logger.error(f"Attempt {attempt + 1} failed for event {event_id}: {e}")
+                if attempt == retry_count - 1:
+                    # Final attempt failed, record the error
+                    return {
+                        "success": False,
+                        "error": str(e),
+                        "attempts": retry_count
+                    }, {
+                        "sync_attempts": retry_count,
+                        "last_sync_attempt": datetime.now(timezone.utc),
+                        "sync_error": str(e)
+                    }
+            
+            # Wait before retry
+            if attempt < retry_count - 1:
+                delay = _backoff_delay(attempt)
+                logger.debug("Retrying event {} in {:.2f}s", event_id, delay)
+                await asyncio.sleep(delay)
+        
+        return {
+            "success": False,
+            "error": "All retry attempts failed",
+            "attempts": retry_count
+        }, None
+    
+    async def _sync_events_batch(self, db: Session, event_ids: List[int]) -> Dict[str, Any]:
+        """Push several events to FOGIS in one batch and record each outcome."""
+        rows = db.query(Event, Match.fogis_match_id).join(Match).filter(
+            Event.id.in_(event_ids),
+            Match.fogis_match_id.isnot(None)
+        ).order_by(Match.fogis_match_id, Event.minute).all()
+        
+        events = [event for event, _ in rows]
+        batch_ids = [event.id for event in events]
+        payload = [
+            {
+                "match_id": fogis_match_id,
+                "event_type": event.event_type,
+                "minute": event.minute,
+                "description": event.description,
+                "player_name": event.player_name,
+                "team": event.team
+            }
+            for event, fogis_match_id in rows
+        ]
+        
+        if not batch_ids:
+            return {"success": True, "events_synced": 0, "events_failed": 0}
         
         try:
-            events = db.query(Event).filter(
+            async with db_manager.connection_released(db):
+                if not self.client._authenticated:
+                    await self.client.authenticate("username", "password")
+                results = await self.client.sync_events_batch(payload)
+        except FOGISIntegrationError as e:
+            logger.error(f"FOGIS batch sync skipped for {len(batch_ids)} events: {e}")
+            return {"success": False, "error": str(e), "events_synced": 0, "events_failed": len(batch_ids)}
+        
+        now = datetime.now(timezone.utc)
+        if len(results) != len(batch_ids):
+            # Results can't be matched to events, so none of them counts as synced
+            message = f"FOGIS returned {len(results)} results for {len(batch_ids)} events"
+            logger.error("FOGIS batch sync failed: {}", message)
+            results = [
+                FOGISSyncResult(success=False, event_id=None, message=message, sync_time=now, attempts=1)
+                for _ in batch_ids
+            ]
+        
+        # The events loaded above are still in the session; their updates commit with the pass
+        events_synced = 0
+        for event, sync_result in zip(events, results):
+            event.sync_attempts = (event.sync_attempts or 0) + 1
+            event.last_sync_attempt = now
+            if sync_result.success:
+                event.synced_to_fogis = True
+                event.fogis_event_id = sync_result.event_id
+                event.sync_error = None
+                events_synced += 1
+            else:
+                event.sync_error = sync_result.message
+                logger.warning("FOGIS sync failed for event {}: {}", event.id, sync_result.message)
+        
+        logger.debug("Batch synced {}/{} events to FOGIS", events_synced, len(batch_ids))
+        return {
+            "success": events_synced == len(batch_ids),
+            "events_synced": events_synced,
+            "events_failed": len(batch_ids) - events_synced
+        }
+    
+    async def get_unsynced_events(self, limit: int = 50) -> List[Event]:
+        """Get events that haven't been synced to FOGIS."""
+        async with db_manager.async_session() as db:
+            return db.query(Event).filter(
                 Event.synced_to_fogis == False,
                 Event.is_deleted == False
             ).limit(limit).all()
-            
-            return events
-            
-        finally:
-            db.close()
+    
+    def _get_unsynced_event_ids(self, db: Session, limit: int) -> List[int]:
+        """Get IDs of events that haven't been synced to FOGIS."""
+        rows = db.query(Event.id).filter(
+            Event.synced_to_fogis == False,
+            Event.is_deleted == False
+        ).limit(limit).all()
+        return [row.id for row in rows]
     
     async def start_background_sync(self) -> None:
         """Start background synchronization."""
@@ -303,27 +498,44 @@ class MatchSyncService:
                 pass
             self._sync_task = None
     
+    async def sync_once(self) -> None:
+        """Run one sync pass for matches and pending events."""
+        # One session for the whole pass; its connection is handed back around every FOGIS call
+        async with db_manager.async_session() as db:
+            # Sync matches from FOGIS
+            match_results = await self.sync_matches_from_fogis(db)
+            
+            # Sync pending events to FOGIS in one request
+            event_ids = self._get_unsynced_event_ids(db, limit=10)
+            event_results: Dict[str, Any] = {}
+            if event_ids:
+                event_results = await self._sync_events_batch(db, event_ids)
+        
+        # One summary per pass; keyword arguments are also bound as structured fields
+        logger.info(
+            "sync_complete: {matches_synced} matches synced ({matches_created} created, "
+            "{matches_updated} updated, {matches_unchanged} unchanged, {match_errors} errors), "
+            "{events_synced} events synced, {events_failed} failed",
+            success=match_results["success"] and event_results.get("success", True),
+            matches_synced=match_results["matches_synced"],
+            matches_created=match_results["matches_created"],
+            matches_updated=match_results["matches_updated"],
+            matches_unchanged=match_results["matches_unchanged"],
+            match_errors=len(match_results.get("errors", [])),
+            events_synced=event_results.get("events_synced", 0),
+            events_failed=event_results.get("events_failed", 0),
+        )
+    
     async def _sync_loop(self) -> None:
         """Background sync loop."""
         try:
-            while self._is_running:
-                try:
-                    # Sync matches from FOGIS
-                    await self.sync_matches_from_fogis()
-                    
-                    # Sync pending events to FOGIS
-                    unsynced_events = await self.get_unsynced_events(limit=10)
-                    for event in unsynced_events:
-                        await self.sync_event_to_fogis(event.id)
-                    
-                    await asyncio.sleep(self._sync_interval)
-                    
-                except asyncio.CancelledError:
-                    break
-                except Exception as e:
-                    logger.error(f"Error in match sync loop: {e}")
-                    await asyncio.sleep(30.0)  # Wait before retrying
-                    
+            await run_periodic(
+                self.sync_once,
+                self._sync_interval,
+                lambda: self._is_running,
+                error_delay=30.0,
+                name="match sync"
+            )
         except asyncio.CancelledError:
             logger.info("Match sync loop cancelled")
     
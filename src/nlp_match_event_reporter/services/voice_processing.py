@@ -4,12 +4,24 @@ Voice processing services for speech-to-text, text-to-speech, and hotword detect
 
 import asyncio
 import base64
+import functools
+from concurrent.futures import ThreadPoolExecutor
 import io
+import math
 import os
+import random
+import shutil
+import sys
 import tempfile
+import threading
 import time
+import uuid
+import wave
+import weakref
+from collections import OrderedDict
 from pathlib import Path
-from typing import Optional, Dict, Any, List, Callable
+from statistics import fmean
+from typing import Optional, Dict, Any, List, Callable, Tuple, Union
 from dataclasses import dataclass
 
 import numpy as np
@@ -18,8 +30,65 @@ from loguru import logger
 from ..core.config import settings
 from ..core.exceptions import VoiceProcessingError
 
+try:
+    import pybase64 as _base64
+except ImportError:  # pragma: no cover - optional speedup
+    _base64 = base64
 
-@dataclass
+try:
+    import pvporcupine
+    import pyaudio
+except ImportError:  # pragma: no cover - optional voice dependencies
+    pvporcupine = None
+    pyaudio = None
+
+try:
+    from scipy.signal import resample_poly
+except ImportError:  # pragma: no cover - optional voice dependency
+    resample_poly = None
+
+# Sample rate Whisper models expect
+WHISPER_SAMPLE_RATE = 16000
+
+# Clips up to one Whisper window are pooled into batched decodes
+WHISPER_WINDOW_SAMPLES = 30 * WHISPER_SAMPLE_RATE
+MAX_TRANSCRIPTION_BATCH = 8
+
+# Whisper inference threads per service; torch already parallelises each call
+# across all cores, so more workers would only oversubscribe the CPU
+WHISPER_WORKERS = 1
+
+# Captured hotword frames buffered before the oldest are dropped
+HOTWORD_FRAME_BUFFER = 8
+
+# Segment counts above this average their log probabilities with numpy
+NUMPY_CONFIDENCE_THRESHOLD = 64
+
+# Rendered TTS phrases kept per service; bounded since each holds seconds of audio
+TTS_CACHE_SIZE = 128
+
+# Longer texts are rendered every time so the cache never pins long clips
+TTS_CACHE_MAX_CHARS = 100
+
+# Longest placeholder silence shared between calls (10 s at 22.05 kHz, ~440 KB)
+SILENCE_CACHE_MAX_SAMPLES = 220_500
+
+# Renderings kept for download after /speak, oldest dropped first
+TTS_AUDIO_STORE_SIZE = 32
+
+# Largest single write when saving audio files
+SAVE_CHUNK_SIZE = 1024 * 1024
+
+# Result objects are created per request; drop their __dict__ where supported
+_RESULT_DATACLASS_OPTIONS: Dict[str, Any] = {"frozen": True}
+if sys.version_info >= (3, 10):
+    _RESULT_DATACLASS_OPTIONS["slots"] = True
+
+# Loaded Whisper models keyed by (size, device), shared while any service holds one
+_loaded_models: "weakref.WeakValueDictionary[Tuple[str, str], Any]" = weakref.WeakValueDictionary()
+
+
+@dataclass(**_RESULT_DATACLASS_OPTIONS)
 class TranscriptionResult:
     """Result from speech-to-text processing."""
     text: str
@@ -29,7 +98,7 @@ class TranscriptionResult:
     segments: Optional[List[Dict[str, Any]]] = None
 
 
-@dataclass
+@dataclass(**_RESULT_DATACLASS_OPTIONS)
 class TTSResult:
     """Result from text-to-speech processing."""
     audio_data: bytes
@@ -38,6 +107,15 @@ class TTSResult:
     processing_time: float
 
 
+@dataclass
+class _PendingTranscription:
+    """Short clip waiting for the next batched Whisper decode."""
+    audio: np.ndarray
+    language: Optional[str]
+    task: str
+    future: asyncio.Future
+
+
 class WhisperService:
     """Service for speech-to-text using OpenAI Whisper."""
     
@@ -45,7 +123,13 @@ class WhisperService:
         """Initialize Whisper service."""
         self.model = None
         self.model_size = settings.WHISPER_MODEL_SIZE
+        self.device: Optional[str] = None
         self._initialized = False
+        self._batch_queue: Optional[asyncio.Queue] = None
+        self._batch_task: Optional[asyncio.Task] = None
+        self._batch_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._scratch_dir: Optional[str] = None
     
     async def initialize(self) -> None:
         """Initialize the Whisper model."""
@@ -54,16 +138,25 @@ class WhisperService:
         
         try:
             import whisper
-            logger.info(f"Loading Whisper model: {self.model_size}")
+            self.device = settings.WHISPER_DEVICE or self._select_device()
+            cache_key = (self.model_size, self.device)
+            model = _loaded_models.get(cache_key)
             
-            # Load model in a thread to avoid blocking
-            loop = asyncio.get_event_loop()
-            self.model = await loop.run_in_executor(
-                None, whisper.load_model, self.model_size
-            )
+            if model is None:
+                logger.info(f"Loading Whisper model: {self.model_size} on {self.device}")
+                
+                # Load model in a thread to avoid blocking
+                # Loading on the inference worker also starts its thread up front
+                model = await self._run_in_worker(
+                    whisper.load_model, self.model_size, device=self.device
+                )
+                _loaded_models[cache_key] = model
+                logger.info("Whisper model loaded successfully")
+            else:
+                logger.info(f"Reusing loaded Whisper model: {self.model_size} on {self.device}")
             
+            self.model = model
             self._initialized = True
-            logger.info("Whisper model loaded successfully")
             
         except ImportError:
             raise VoiceProcessingError(
@@ -72,6 +165,15 @@ class WhisperService:
         except Exception as e:
             raise VoiceProcessingError(f"Failed to initialize Whisper: {e}")
     
+    @staticmethod
+    def _select_device() -> str:
+        """Pick CUDA when torch reports a usable GPU, otherwise CPU."""
+        try:
+            import torch
+        except ImportError:
+            return "cpu"
+        return "cuda" if torch.cuda.is_available() else "cpu"
+    
     async def transcribe_audio(
         self,
         audio_data: bytes,
@@ -95,68 +197,246 @@ class WhisperService:
         start_time = time.time()
         
         try:
-            # Save audio data to temporary file
-            with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as temp_file:
-                temp_file.write(audio_data)
-                temp_path = temp_file.name
+            # Hand PCM WAV straight to Whisper; other formats go through ffmpeg
+            audio = decode_wav_audio(audio_data)
+            if audio is not None and len(audio) <= WHISPER_WINDOW_SAMPLES:
+                # Short clips share a forward pass when other requests are pending
+                pooled = await self._transcribe_pooled(audio, language, task)
+                if pooled is not None:
+                    return pooled
             
-            try:
-                # Transcribe in executor to avoid blocking
-                loop = asyncio.get_event_loop()
-                result = await loop.run_in_executor(
-                    None,
-                    self._transcribe_file,
-                    temp_path,
-                    language,
-                    task
-                )
-                
-                processing_time = time.time() - start_time
-                
-                # Extract confidence from segments if available
-                confidence = 0.0
-                if result.get("segments"):
-                    confidences = [
-                        segment.get("avg_logprob", 0.0)
-                        for segment in result["segments"]
-                    ]
-                    if confidences:
-                        # Convert log probabilities to confidence scores
-                        confidence = float(np.exp(np.mean(confidences)))
-                
-                return TranscriptionResult(
-                    text=result["text"].strip(),
-                    confidence=min(max(confidence, 0.0), 1.0),
-                    language=result.get("language", language or "unknown"),
-                    processing_time=processing_time,
-                    segments=result.get("segments", [])
-                )
-                
-            finally:
-                # Clean up temporary file
-                os.unlink(temp_path)
-                
+            if audio is not None:
+                result = await self._run_in_worker(self._transcribe, audio, language, task)
+            else:
+                result = await self._transcribe_via_file(audio_data, language, task)
+            
+            processing_time = time.time() - start_time
+            
+            # Extract confidence from segments if available
+            confidence = _segment_confidence(result.get("segments"))
+            
+            return TranscriptionResult(
+                text=result["text"].strip(),
+                confidence=confidence,
+                language=result.get("language", language or "unknown"),
+                processing_time=processing_time,
+                segments=result.get("segments", [])
+            )
+            
+        except VoiceProcessingError:
+            raise
         except Exception as e:
             processing_time = time.time() - start_time
             logger.error(f"Transcription failed after {processing_time:.2f}s: {e}")
             raise VoiceProcessingError(f"Transcription failed: {e}")
     
-    def _transcribe_file(
+    async def _transcribe_pooled(
         self,
-        file_path: str,
+        audio: np.ndarray,
+        language: Optional[str],
+        task: str
+    ) -> Optional[TranscriptionResult]:
+        """
+        Queue a short clip for the next batched decode and wait for its result.
+        
+        Returns None when no other request shared the batch, so the caller can
+        use model.transcribe() with its temperature fallback and segments.
+        """
+        future = asyncio.get_running_loop().create_future()
+        self._get_batch_queue().put_nowait(
+            _PendingTranscription(audio, language, task, future)
+        )
+        return await future
+    
+    def _get_batch_queue(self) -> asyncio.Queue:
+        """Get the request pool, starting its consumer on the running loop if needed."""
+        loop = asyncio.get_running_loop()
+        if self._batch_task is None or self._batch_task.done() or self._batch_loop is not loop:
+            self._batch_queue = asyncio.Queue()
+            self._batch_loop = loop
+            self._batch_task = loop.create_task(self._run_batches(self._batch_queue))
+        return self._batch_queue
+    
+    async def _run_batches(self, queue: asyncio.Queue) -> None:
+        """Decode pooled clips, batching every request that queued up meanwhile."""
+        while True:
+            pending = [await queue.get()]
+            while len(pending) < MAX_TRANSCRIPTION_BATCH and not queue.empty():
+                pending.append(queue.get_nowait())
+            
+            # Decoding options are per batch, so split by language and task
+            groups: Dict[Tuple[Optional[str], str], List[_PendingTranscription]] = {}
+            for item in pending:
+                groups.setdefault((item.language, item.task), []).append(item)
+            
+            for (language, task), items in groups.items():
+                if len(items) == 1:
+                    # A single decode pass would only lose quality for a lone clip
+                    if not items[0].future.done():
+                        items[0].future.set_result(None)
+                    continue
+                
+                try:
+                    results = await self.transcribe_batch(
+                        [item.audio for item in items], language, task
+                    )
+                except Exception as e:
+                    for item in items:
+                        if not item.future.done():
+                            item.future.set_exception(e)
+                else:
+                    for item, result in zip(items, results):
+                        if not item.future.done():
+                            item.future.set_result(result)
+    
+    async def _run_in_worker(self, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """Run blocking Whisper work on the service's dedicated inference thread."""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=WHISPER_WORKERS,
+                thread_name_prefix="whisper",
+                initializer=_configure_torch_threads
+            )
+        
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(func, *args, **kwargs))
+    
+    async def close(self) -> None:
+        """Stop the batching consumer and the inference thread."""
+        if self._batch_task:
+            self._batch_task.cancel()
+            try:
+                await self._batch_task
+            except asyncio.CancelledError:
+                pass
+            self._batch_task = None
+            self._batch_queue = None
+        
+        if self._executor:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+        
+        if self._scratch_dir:
+            shutil.rmtree(self._scratch_dir, ignore_errors=True)
+            self._scratch_dir = None
+    
+    async def _transcribe_via_file(
+        self,
+        audio_data: bytes,
+        language: Optional[str],
+        task: str
+    ) -> Dict[str, Any]:
+        """Transcribe encoded audio by letting Whisper decode it from a scratch file."""
+        if self._scratch_dir is None:
+            self._scratch_dir = tempfile.mkdtemp(prefix="whisper-")
+        
+        return await self._run_in_worker(self._transcribe_encoded, audio_data, language, task)
+    
+    def _transcribe_encoded(
+        self,
+        audio_data: bytes,
         language: Optional[str],
         task: str
     ) -> Dict[str, Any]:
-        """Transcribe audio file (runs in executor)."""
+        """Transcribe encoded audio via this thread's scratch file (runs in a worker thread)."""
+        # Each worker thread overwrites its own file instead of creating and unlinking one per call
+        scratch_path = os.path.join(self._scratch_dir, f"{threading.get_ident()}.wav")
+        save_audio_file(audio_data, scratch_path)
+        return self._transcribe(scratch_path, language, task)
+    
+    def _transcribe(
+        self,
+        audio: Union[str, np.ndarray],
+        language: Optional[str],
+        task: str
+    ) -> Dict[str, Any]:
+        """Transcribe a file path or 16 kHz waveform (runs in a worker thread)."""
         options = {
             "task": task,
             "verbose": False,
+            # Half precision only pays off on GPU; on CPU Whisper falls back with a warning
+            "fp16": self.device == "cuda",
         }
         
         if language:
             options["language"] = language
         
-        return self.model.transcribe(file_path, **options)
+        return self.model.transcribe(audio, **options)
+    
+    async def transcribe_batch(
+        self,
+        audios: List[np.ndarray],
+        language: Optional[str] = None,
+        task: str = "transcribe"
+    ) -> List[TranscriptionResult]:
+        """
+        Transcribe several short clips in a single model forward pass.
+        
+        Args:
+            audios: Mono float32 waveforms at 16 kHz, up to 30 seconds each
+            language: Language code (e.g., 'sv' for Swedish)
+            task: 'transcribe' or 'translate'
+        
+        Returns:
+            One TranscriptionResult per clip, in input order
+        """
+        if not audios:
+            return []
+        
+        if not self._initialized:
+            await self.initialize()
+        
+        start_time = time.time()
+        
+        try:
+            results = await self._run_in_worker(self._decode_batch, audios, language, task)
+            
+            processing_time = time.time() - start_time
+            
+            return [
+                TranscriptionResult(
+                    text=result.text.strip(),
+                    confidence=min(max(math.exp(result.avg_logprob), 0.0), 1.0),
+                    language=result.language or language or "unknown",
+                    processing_time=processing_time,
+                    segments=[]
+                )
+                for result in results
+            ]
+            
+        except Exception as e:
+            processing_time = time.time() - start_time
+            logger.error(f"Batch transcription failed after {processing_time:.2f}s: {e}")
+            raise VoiceProcessingError(f"Batch transcription failed: {e}")
+    
+    def _decode_batch(
+        self,
+        audios: List[np.ndarray],
+        language: Optional[str],
+        task: str
+    ) -> List[Any]:
+        """Extract log-mel features on the model device and decode them as one batch (runs in a worker thread)."""
+        import torch
+        import whisper
+        
+        # Features are computed per clip: Whisper clamps the log-mel floor relative to
+        # the maximum of the whole input, so a shared STFT would let loud clips change
+        # the features of quiet ones batched alongside them
+        mel = torch.stack([
+            whisper.log_mel_spectrogram(
+                whisper.pad_or_trim(audio),
+                n_mels=self.model.dims.n_mels,
+                device=self.device
+            )
+            for audio in audios
+        ])
+        
+        options = whisper.DecodingOptions(
+            task=task,
+            language=language,
+            fp16=self.device == "cuda"
+        )
+        return whisper.decode(self.model, mel, options)
     
     async def transcribe_file(self, file_path: str, **kwargs) -> TranscriptionResult:
         """Transcribe audio file directly."""
@@ -174,6 +454,9 @@ class KokoroTTSService:
         self.model = None
         self._initialized = False
         self.sample_rate = 22050  # Default sample rate for Kokoro
+        # Stock phrases repeat throughout a match, so keep recently rendered audio
+        self._render_cached = functools.lru_cache(maxsize=TTS_CACHE_SIZE)(self._render_speech)
+        self._stored_audio: "OrderedDict[str, TTSResult]" = OrderedDict()
     
     async def initialize(self) -> None:
         """Initialize the Kokoro TTS model."""
@@ -223,16 +506,8 @@ class KokoroTTSService:
             # In a real implementation, you would use the Kokoro TTS model
             logger.info(f"Synthesizing speech: '{text[:50]}...' with voice '{voice}'")
             
-            # Simulate TTS processing
-            await asyncio.sleep(len(text) * 0.01)  # Simulate processing time
-            
-            # Generate placeholder audio data (silence)
-            duration = len(text) * 0.1  # Estimate duration
-            num_samples = int(self.sample_rate * duration)
-            audio_data = np.zeros(num_samples, dtype=np.float32)
-            
-            # Convert to bytes
-            audio_bytes = (audio_data * 32767).astype(np.int16).tobytes()
+            render = self._render_cached if len(text) <= TTS_CACHE_MAX_CHARS else self._render_speech
+            audio_bytes, duration = await asyncio.to_thread(render, text, voice, speed, pitch)
             
             processing_time = time.time() - start_time
             
@@ -248,6 +523,37 @@ class KokoroTTSService:
             logger.error(f"TTS synthesis failed after {processing_time:.2f}s: {e}")
             raise VoiceProcessingError(f"TTS synthesis failed: {e}")
 
+    
+    def store_audio(self, result: TTSResult) -> str:
+        """Keep a rendering so it can be downloaded later and return its id."""
+        audio_id = uuid.uuid4().hex
+        self._stored_audio[audio_id] = result
+        if len(self._stored_audio) > TTS_AUDIO_STORE_SIZE:
+            self._stored_audio.popitem(last=False)
+        return audio_id
+    
+    def get_stored_audio(self, audio_id: str) -> Optional[TTSResult]:
+        """Get a rendering kept by store_audio, or None if it expired or never existed."""
+        return self._stored_audio.get(audio_id)
+    
+    def _render_speech(
+        self,
+        text: str,
+        voice: str,
+        speed: float,
+        pitch: float
+    ) -> Tuple[bytes, float]:
+        """Render text to 16-bit PCM audio and its duration (runs in a worker thread, memoized per phrase)."""
+        # Simulate TTS processing
+        time.sleep(len(text) * 0.01)
+        
+        # Generate placeholder audio data (silence) as zeroed 16-bit PCM.
+        # Real model output should be converted in one pass, e.g.
+        # (x.clamp(-1, 1) * 32767).to(torch.int16).cpu().numpy().tobytes()
+        duration = len(text) * 0.1  # Estimate duration
+        num_samples = int(self.sample_rate * duration)
+        return _silence_pcm16(num_samples), duration
+
 
 class PorcupineHotwordService:
     """Service for hotword detection using Picovoice Porcupine."""
@@ -255,6 +561,7 @@ class PorcupineHotwordService:
     def __init__(self):
         """Initialize Porcupine hotword service."""
         self.porcupine = None
+        self._access_key: Optional[str] = None
         self._initialized = False
         self._is_listening = False
         self._detection_callback: Optional[Callable[[str], None]] = None
@@ -271,9 +578,11 @@ class PorcupineHotwordService:
             logger.info("Initializing Porcupine hotword detection...")
             
             # Check for access key
-            access_key = os.getenv("PICOVOICE_ACCESS_KEY")
-            if not access_key:
+            self._access_key = os.getenv("PICOVOICE_ACCESS_KEY")
+            if not self._access_key:
                 logger.warning("PICOVOICE_ACCESS_KEY not set, using mock implementation")
+            elif pvporcupine is None:
+                logger.warning("pvporcupine/pyaudio not installed, using mock implementation")
             
             # Simulate initialization
             await asyncio.sleep(0.1)
@@ -314,9 +623,11 @@ class PorcupineHotwordService:
         self._is_listening = True
         
         # Start listening task
-        self._listen_task = asyncio.create_task(
-            self._listen_for_hotwords(keywords, sensitivity)
-        )
+        if self._access_key and pvporcupine is not None:
+            listener = self._listen_with_porcupine(keywords, sensitivity)
+        else:
+            listener = self._listen_for_hotwords(keywords, sensitivity)
+        self._listen_task = asyncio.create_task(listener)
     
     async def stop_listening(self) -> None:
         """Stop listening for hotwords."""
@@ -354,8 +665,59 @@ class PorcupineHotwordService:
                 await asyncio.sleep(0.1)
                 
                 # Simulate occasional detection for testing
-                if np.random.random() < 0.001:  # Very low probability
-                    detected_keyword = np.random.choice(keywords)
+                if random.random() < 0.001:  # Very low probability
+                    detected_keyword = random.choice(keywords)
+                    logger.info(f"Hotword detected: {detected_keyword}")
+                    if self._detection_callback:
+                        self._detection_callback(detected_keyword)
+                
+        except asyncio.CancelledError:
+            logger.info("Hotword listening cancelled")
+        except Exception as e:
+            logger.error(f"Error in hotword detection: {e}")
+            self._is_listening = False
+    
+    async def _listen_with_porcupine(
+        self,
+        keywords: List[str],
+        sensitivity: float
+    ) -> None:
+        """Run Porcupine on microphone frames pushed from the audio callback."""
+        loop = asyncio.get_running_loop()
+        frames: asyncio.Queue = asyncio.Queue(maxsize=HOTWORD_FRAME_BUFFER)
+        
+        def on_audio(in_data, frame_count, time_info, status):
+            """Hand a captured frame to the event loop (runs on the audio thread)."""
+            loop.call_soon_threadsafe(_put_latest, frames, in_data)
+            return None, pyaudio.paContinue
+        
+        audio = None
+        stream = None
+        
+        try:
+            # Setup runs inside the try so a bad access key or missing input device
+            # releases whatever was acquired and clears the listening flag
+            self.porcupine = pvporcupine.create(
+                access_key=self._access_key,
+                keywords=keywords,
+                sensitivities=[sensitivity] * len(keywords)
+            )
+            audio = pyaudio.PyAudio()
+            stream = audio.open(
+                rate=self.porcupine.sample_rate,
+                channels=1,
+                format=pyaudio.paInt16,
+                input=True,
+                frames_per_buffer=self.porcupine.frame_length,
+                input_device_index=settings.AUDIO_INPUT_DEVICE_INDEX,
+                stream_callback=on_audio
+            )
+            
+            while self._is_listening:
+                frame = np.frombuffer(await frames.get(), dtype=np.int16)
+                keyword_index = self.porcupine.process(frame)
+                if keyword_index >= 0:
+                    detected_keyword = keywords[keyword_index]
                     logger.info(f"Hotword detected: {detected_keyword}")
                     if self._detection_callback:
                         self._detection_callback(detected_keyword)
@@ -365,6 +727,15 @@ class PorcupineHotwordService:
         except Exception as e:
             logger.error(f"Error in hotword detection: {e}")
             self._is_listening = False
+        finally:
+            if stream is not None:
+                stream.stop_stream()
+                stream.close()
+            if audio is not None:
+                audio.terminate()
+            if self.porcupine is not None:
+                self.porcupine.delete()
+                self.porcupine = None
     
     @property
     def is_listening(self) -> bool:
@@ -372,20 +743,88 @@ class PorcupineHotwordService:
         return self._is_listening
 
 
+def _segment_confidence(segments: Optional[List[Dict[str, Any]]]) -> float:
+    """Convert the mean segment log probability to a 0-1 confidence score."""
+    if not segments:
+        return 0.0
+    
+    if len(segments) > NUMPY_CONFIDENCE_THRESHOLD:
+        logprobs = np.fromiter(
+            (segment.get("avg_logprob", 0.0) for segment in segments),
+            dtype=np.float64,
+            count=len(segments)
+        )
+        mean_logprob = float(logprobs.mean())
+    else:
+        # Plain floats avoid numpy's per-call overhead for typical short clips
+        mean_logprob = fmean(segment.get("avg_logprob", 0.0) for segment in segments)
+    
+    return min(max(math.exp(mean_logprob), 0.0), 1.0)
+
+
+def _configure_torch_threads() -> None:
+    """Let torch use every core for the single Whisper inference thread."""
+    try:
+        import torch
+    except ImportError:
+        return
+    torch.set_num_threads(os.cpu_count() or 1)
+
+
+def _silence_pcm16(num_samples: int) -> bytes:
+    """Get silent 16-bit PCM audio; clips up to SILENCE_CACHE_MAX_SAMPLES are shared."""
+    if num_samples > SILENCE_CACHE_MAX_SAMPLES:
+        return bytes(num_samples * 2)
+    return _shared_silence_pcm16(num_samples)
+
+
+@functools.lru_cache(maxsize=64)
+def _shared_silence_pcm16(num_samples: int) -> bytes:
+    """Get silent 16-bit PCM audio, shared between calls of the same length."""
+    return bytes(num_samples * 2)
+
+
+def _put_latest(queue: asyncio.Queue, item: Any) -> None:
+    """Add an item to a bounded queue, dropping the oldest entry when full."""
+    if queue.full():
+        queue.get_nowait()
+    queue.put_nowait(item)
+
+
 # Global service instances
 whisper_service = WhisperService()
 tts_service = KokoroTTSService()
 hotword_service = PorcupineHotwordService()
 
 
+def get_whisper_service() -> WhisperService:
+    """FastAPI dependency returning the shared Whisper service."""
+    return whisper_service
+
+
+def get_tts_service() -> KokoroTTSService:
+    """FastAPI dependency returning the shared TTS service."""
+    return tts_service
+
+
+def get_hotword_service() -> PorcupineHotwordService:
+    """FastAPI dependency returning the shared hotword service."""
+    return hotword_service
+
+
 async def initialize_voice_services() -> None:
     """Initialize all voice processing services."""
     logger.info("Initializing voice processing services...")
     
     try:
-        await whisper_service.initialize()
-        await tts_service.initialize()
-        await hotword_service.initialize()
+        # The services are independent, so bring them up concurrently
+        initializers = [tts_service.initialize(), hotword_service.initialize()]
+        if settings.TESTING:
+            # Tests override the services; Whisper loads lazily if ever used
+            logger.info("Testing mode: skipping Whisper model load")
+        else:
+            initializers.append(whisper_service.initialize())
+        await asyncio.gather(*initializers)
         logger.info("All voice processing services initialized successfully")
     except Exception as e:
         logger.error(f"Failed to initialize voice services: {e}")
@@ -398,6 +837,7 @@ async def cleanup_voice_services() -> None:
     
     try:
         await hotword_service.stop_listening()
+        await whisper_service.close()
         logger.info("Voice processing services cleaned up successfully")
     except Exception as e:
         logger.error(f"Error cleaning up voice services: {e}")
@@ -406,16 +846,86 @@ async def cleanup_voice_services() -> None:
 # Utility functions
 def encode_audio_base64(audio_data: bytes) -> str:
     """Encode audio data as base64 string."""
-    return base64.b64encode(audio_data).decode('utf-8')
+    return _base64.b64encode(audio_data).decode('ascii')
 
 
 def decode_audio_base64(audio_base64: str) -> bytes:
     """Decode base64 audio string to bytes."""
-    return base64.b64decode(audio_base64)
+    return _base64.b64decode(audio_base64)
+
+
+def decode_wav_audio(audio_data: bytes) -> Optional[np.ndarray]:
+    """
+    Decode 16-bit PCM WAV bytes into a mono float32 waveform at 16 kHz.
+    
+    Returns:
+        The waveform, or None if the data is not 16-bit PCM WAV, is
+        truncated, or needs downsampling without scipy available
+    """
+    try:
+        with wave.open(io.BytesIO(audio_data), "rb") as wav:
+            sample_width = wav.getsampwidth()
+            channels = wav.getnchannels()
+            sample_rate = wav.getframerate()
+            frames = wav.readframes(wav.getnframes())
+    except (wave.Error, EOFError):
+        return None
+    
+    if sample_width != 2 or not frames:
+        return None
+    
+    if sample_rate > WHISPER_SAMPLE_RATE and resample_poly is None:
+        # Downsampling needs an anti-aliasing filter; let ffmpeg resample instead
+        return None
+    
+    try:
+        audio = np.frombuffer(frames, dtype="<i2").astype(np.float32) / 32768.0
+        if channels > 1:
+            audio = audio.reshape(-1, channels).mean(axis=1, dtype=np.float32)
+    except ValueError:
+        # A truncated file can end mid-sample or mid-frame; let ffmpeg decode it
+        return None
+    
+    if sample_rate > WHISPER_SAMPLE_RATE:
+        # Polyphase filtering low-passes before decimating so content above
+        # 8 kHz does not alias into the band Whisper listens to
+        divisor = math.gcd(sample_rate, WHISPER_SAMPLE_RATE)
+        audio = resample_poly(
+            audio, WHISPER_SAMPLE_RATE // divisor, sample_rate // divisor
+        ).astype(np.float32)
+    elif sample_rate < WHISPER_SAMPLE_RATE:
+        # Upsampling adds no new frequencies, so linear interpolation is enough
+        target_length = int(round(len(audio) * WHISPER_SAMPLE_RATE / sample_rate))
+        audio = np.interp(
+            np.linspace(0, len(audio) - 1, target_length),
+            np.arange(len(audio)),
+            audio
+        ).astype(np.float32)
+    
+    return audio
+
+
+def encode_wav_audio(pcm_data: bytes, sample_rate: int, channels: int = 1) -> bytes:
+    """Wrap raw 16-bit PCM samples in a WAV container."""
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(channels)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes(pcm_data)
+    return buffer.getvalue()
 
 
-def save_audio_file(audio_data: bytes, file_path: str) -> None:
-    """Save audio data to file."""
+def save_audio_file(audio_data: Union[bytes, bytearray, memoryview], file_path: str) -> None:
+    """Save audio data to file without copying the buffer."""
     Path(file_path).parent.mkdir(parents=True, exist_ok=True)
-    with open(file_path, 'wb') as f:
-        f.write(audio_data)
+    
+    view = memoryview(audio_data).cast("B")
+    fd = os.open(file_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        offset = 0
+        while offset < len(view):
+            # os.write may write less than requested, so resume from the offset
+            offset += os.write(fd, view[offset:offset + SAVE_CHUNK_SIZE])
+    finally:
+        os.close(fd)
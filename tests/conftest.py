@@ -2,19 +2,182 @@
 Pytest configuration and fixtures for NLP Match Event Reporter tests.
 """
 
+import os
+import shutil
+import tempfile
+
+import httpx
 import pytest
+import pytest_asyncio
 from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.dialects import sqlite
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import QueuePool
+from sqlalchemy.schema import CreateIndex, CreateTable
 from unittest.mock import Mock
 
+# Settings are read at import time, so testing mode must be set before the app loads
+os.environ.setdefault("TESTING", "true")
+
 from src.nlp_match_event_reporter.main import app
 from src.nlp_match_event_reporter.core.config import settings
+from src.nlp_match_event_reporter.core.database import get_database_session
+from src.nlp_match_event_reporter.models.database import Base
+
+
+def _compile_schema_ddl() -> str:
+    """Compile the model schema to a SQLite DDL script."""
+    dialect = sqlite.dialect()
+    statements = []
+    for table in Base.metadata.sorted_tables:
+        statements.append(str(CreateTable(table).compile(dialect=dialect)).strip())
+        statements.extend(
+            str(CreateIndex(index).compile(dialect=dialect)) for index in table.indexes
+        )
+    return ";\n".join(statements) + ";\n"
+
+
+# Compiled once so the test database is built with a single executescript call
+SCHEMA_DDL = _compile_schema_ddl()
+
+
+def _test_db_override(test_db):
+    """Build a get_database_session override that opens sessions from the test database."""
+    def override_get_db():
+        db = test_db()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    return override_get_db
+
+
+@pytest.fixture(scope="session")
+def app_client(started_app):
+    """Create a test client for the FastAPI application without running its lifespan again."""
+    # Used outside a with-block so the client skips startup and shutdown;
+    # the session lifespan in started_app has already initialized the app
+    return TestClient(started_app)
+
+
+@pytest.fixture
+def client(app_client, test_db):
+    """Route the session-wide test client's database dependency to the test database."""
+    app.dependency_overrides[get_database_session] = _test_db_override(test_db)
+    yield app_client
+    app.dependency_overrides.pop(get_database_session, None)
+
+
+@pytest_asyncio.fixture(scope="session", loop_scope="session")
+async def started_app():
+    """Run the application lifespan once on the session event loop."""
+    async with app.router.lifespan_context(app):
+        yield app
+
+
+@pytest_asyncio.fixture(scope="session", loop_scope="session")
+async def _async_client(started_app):
+    """Create one in-process ASGI client, and its connection pool, for the session."""
+    transport = httpx.ASGITransport(app=started_app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as async_client:
+        yield async_client
+
+
+@pytest.fixture
+def aclient(_async_client, test_db):
+    """Route the session-wide ASGI client's database dependency to the test database."""
+    app.dependency_overrides[get_database_session] = _test_db_override(test_db)
+    yield _async_client
+    app.dependency_overrides.pop(get_database_session, None)
+
+
+@pytest.fixture(scope="session", autouse=True)
+def ram_backed_tempdir():
+    """Write temporary files under a RAM-backed directory when one is available."""
+    tmp_root = os.environ.get("PYTEST_TMPDIR", "/dev/shm")
+    if not (os.path.isdir(tmp_root) and os.access(tmp_root, os.W_OK)):
+        yield tempfile.gettempdir()
+        return
+
+    # A private subdirectory lets files the app leaves behind be removed in one go
+    session_dir = tempfile.mkdtemp(prefix="pytest-", dir=tmp_root)
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(tempfile, "tempdir", session_dir)
+        yield session_dir
+    shutil.rmtree(session_dir, ignore_errors=True)
+
+
+@pytest.fixture(scope="session")
+def db_engine():
+    """Create the in-memory test database and its schema once per session."""
+    # A named shared-cache database accepts several connections, and each
+    # pytest-xdist worker gets its own name so workers stay isolated
+    worker_id = os.environ.get("PYTEST_XDIST_WORKER", "master")
+    engine = create_engine(
+        f"sqlite+pysqlite:///file:test_{worker_id}?mode=memory&cache=shared&uri=true",
+        connect_args={"check_same_thread": False},
+        poolclass=QueuePool,
+    )
+
+    # pysqlite manages transactions itself and ignores SAVEPOINT boundaries;
+    # take over so per-test rollbacks undo everything the test committed
+    @event.listens_for(engine, "connect")
+    def disable_pysqlite_transactions(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(engine, "begin")
+    def emit_begin(connection):
+        connection.exec_driver_sql("BEGIN")
+
+    # Keep journals and temporary tables in memory and never wait on fsync
+    @event.listens_for(engine, "connect")
+    def set_fast_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=MEMORY")
+        cursor.execute("PRAGMA synchronous=OFF")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+        cursor.close()
+
+    raw_connection = engine.raw_connection()
+    try:
+        raw_connection.driver_connection.executescript(SCHEMA_DDL)
+    finally:
+        raw_connection.close()
+
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def db_connection(db_engine):
+    """Open a connection whose outer transaction is rolled back after the test."""
+    connection = db_engine.connect()
+    transaction = connection.begin()
+    yield connection
+    transaction.rollback()
+    connection.close()
+
+
+@pytest.fixture
+def test_db(db_connection):
+    """Create a session factory on the shared test database, rolled back after each test."""
+    return sessionmaker(
+        autocommit=False,
+        autoflush=False,
+        bind=db_connection,
+        join_transaction_mode="create_savepoint",
+    )
 
 
 @pytest.fixture
-def client():
-    """Create a test client for the FastAPI application."""
-    with TestClient(app) as test_client:
-        yield test_client
+def db_session(db_connection):
+    """Create a database session isolated from other tests by a rolled-back transaction."""
+    # Commits inside the test release a SAVEPOINT instead of the outer transaction
+    session = Session(bind=db_connection, join_transaction_mode="create_savepoint")
+    yield session
+    session.close()
 
 
 @pytest.fixture
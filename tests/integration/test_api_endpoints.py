@@ -4,51 +4,9 @@ Integration tests for API endpoints with database.
 
 import pytest
 from datetime import datetime, timezone, timedelta
-from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
-from sqlalchemy.pool import StaticPool
+from sqlalchemy import insert
 
-from src.nlp_match_event_reporter.main import app
-from src.nlp_match_event_reporter.models.database import Base, Match, Event
-from src.nlp_match_event_reporter.core.database import get_database_session
-
-
-@pytest.fixture
-def test_db():
-    """Create a test database."""
-    # Create in-memory SQLite database for testing
-    engine = create_engine(
-        "sqlite:///:memory:",
-        connect_args={"check_same_thread": False},
-        poolclass=StaticPool,
-    )
-    
-    # Create all tables
-    Base.metadata.create_all(bind=engine)
-    
-    # Create session factory
-    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-    
-    return SessionLocal
-
-
-@pytest.fixture
-def client(test_db):
-    """Create a test client with database override."""
-    def override_get_db():
-        db = test_db()
-        try:
-            yield db
-        finally:
-            db.close()
-    
-    app.dependency_overrides[get_database_session] = override_get_db
-    
-    with TestClient(app) as test_client:
-        yield test_client
-    
-    app.dependency_overrides.clear()
+from src.nlp_match_event_reporter.models.database import Match, Event
 
 
 @pytest.fixture
@@ -56,68 +14,71 @@ def sample_data(test_db):
     """Create sample data for testing."""
     db = test_db()
     
-    # Create sample matches
-    match1 = Match(
-        fogis_match_id=123456,
-        home_team="AIK",
-        away_team="Hammarby",
-        home_team_id=1001,
-        away_team_id=1002,
-        match_date=datetime.now(timezone.utc) + timedelta(days=1),
-        venue="Friends Arena",
-        competition="Allsvenskan",
-        status="scheduled",
-        referee_id=5001,
-        referee_name="Test Referee",
-    )
-    
-    match2 = Match(
-        fogis_match_id=123457,
-        home_team="Malmö FF",
-        away_team="IFK Norrköping",
-        home_team_id=1005,
-        away_team_id=1006,
-        match_date=datetime.now(timezone.utc) - timedelta(hours=2),
-        venue="Eleda Stadion",
-        competition="Allsvenskan",
-        status="active",
-        referee_id=5003,
-        referee_name="Active Referee",
-        is_active=True,
-        reporting_started_at=datetime.now(timezone.utc) - timedelta(hours=2),
-    )
-    
-    db.add_all([match1, match2])
-    db.commit()
+    # Seed rows with bulk inserts; the tests read them back through the API
+    match_ids = db.scalars(
+        insert(Match).returning(Match.id, sort_by_parameter_order=True),
+        [
+            {
+                "fogis_match_id": 123456,
+                "home_team": "AIK",
+                "away_team": "Hammarby",
+                "home_team_id": 1001,
+                "away_team_id": 1002,
+                "match_date": datetime.now(timezone.utc) + timedelta(days=1),
+                "venue": "Friends Arena",
+                "competition": "Allsvenskan",
+                "status": "scheduled",
+                "referee_id": 5001,
+                "referee_name": "Test Referee",
+            },
+            {
+                "fogis_match_id": 123457,
+                "home_team": "Malmö FF",
+                "away_team": "IFK Norrköping",
+                "home_team_id": 1005,
+                "away_team_id": 1006,
+                "match_date": datetime.now(timezone.utc) - timedelta(hours=2),
+                "venue": "Eleda Stadion",
+                "competition": "Allsvenskan",
+                "status": "active",
+                "referee_id": 5003,
+                "referee_name": "Active Referee",
+                "is_active": True,
+                "reporting_started_at": datetime.now(timezone.utc) - timedelta(hours=2),
+            },
+        ],
+    ).all()
     
     # Create sample events for active match
-    event1 = Event(
-        match_id=match2.id,
-        event_type="goal",
-        minute=15,
-        description="Goal scored by Erik Karlsson",
-        player_name="Erik Karlsson",
-        team="Malmö FF",
-        voice_transcription="Mål av Erik Karlsson i femtonde minuten",
-        confidence_score=0.95,
-    )
+    event_ids = db.scalars(
+        insert(Event).returning(Event.id, sort_by_parameter_order=True),
+        [
+            {
+                "match_id": match_ids[1],
+                "event_type": "goal",
+                "minute": 15,
+                "description": "Goal scored by Erik Karlsson",
+                "player_name": "Erik Karlsson",
+                "team": "Malmö FF",
+                "voice_transcription": "Mål av Erik Karlsson i femtonde minuten",
+                "confidence_score": 0.95,
+            },
+            {
+                "match_id": match_ids[1],
+                "event_type": "yellow_card",
+                "minute": 23,
+                "description": "Yellow card for Marcus Johansson",
+                "player_name": "Marcus Johansson",
+                "team": "IFK Norrköping",
+                "voice_transcription": "Gult kort för Marcus Johansson",
+                "confidence_score": 0.88,
+            },
+        ],
+    ).all()
     
-    event2 = Event(
-        match_id=match2.id,
-        event_type="yellow_card",
-        minute=23,
-        description="Yellow card for Marcus Johansson",
-        player_name="Marcus Johansson",
-        team="IFK Norrköping",
-        voice_transcription="Gult kort för Marcus Johansson",
-        confidence_score=0.88,
-    )
-    
-    db.add_all([event1, event2])
     db.commit()
-    
     db.close()
-    return {"matches": [match1, match2], "events": [event1, event2]}
+    return {"matches": match_ids, "events": event_ids}
 
 
 def test_health_endpoints(client):
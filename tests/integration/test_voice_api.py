@@ -3,106 +3,193 @@ Integration tests for voice API endpoints.
 """
 
 import pytest
+import pytest_asyncio
 import tempfile
 import io
-from unittest.mock import patch, MagicMock
-from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
-from sqlalchemy.pool import StaticPool
+import wave
+from unittest.mock import MagicMock
+
+import httpx
 
 from src.nlp_match_event_reporter.main import app
-from src.nlp_match_event_reporter.models.database import Base, VoiceProcessingLog
 from src.nlp_match_event_reporter.core.database import get_database_session
+from src.nlp_match_event_reporter.models.database import VoiceProcessingLog
+from src.nlp_match_event_reporter.core.exceptions import VoiceProcessingError
+from src.nlp_match_event_reporter.services.voice_processing import (
+    KokoroTTSService,
+    PorcupineHotwordService,
+    TTSResult,
+    TranscriptionResult,
+    WhisperService,
+    get_whisper_service,
+    get_tts_service,
+    get_hotword_service,
+)
+
+
+@pytest_asyncio.fixture(loop_scope="session")
+async def client(started_app, db_session):
+    """Create an in-process ASGI client whose requests share the test's database session."""
+    def override_get_db():
+        yield db_session
+
+    started_app.dependency_overrides[get_database_session] = override_get_db
+    transport = httpx.ASGITransport(app=started_app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as async_client:
+        yield async_client
+    started_app.dependency_overrides.pop(get_database_session, None)
+
+
+@pytest_asyncio.fixture(scope="module", loop_scope="session")
+async def client_no_db(started_app):
+    """Create a module-wide ASGI client for requests rejected before the database is used."""
+    transport = httpx.ASGITransport(app=started_app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as async_client:
+        yield async_client
+
+
+# A simple WAV-like header followed by silence
+SAMPLE_AUDIO_BYTES = b"RIFF\x24\x08\x00\x00WAVEfmt \x10\x00\x00\x00" + b"\x00" * 100
 
 
 @pytest.fixture
-def test_db():
-    """Create a test database."""
-    # Create in-memory SQLite database for testing
-    engine = create_engine(
-        "sqlite:///:memory:",
-        connect_args={"check_same_thread": False},
-        poolclass=StaticPool,
-    )
-    
-    # Create all tables
-    Base.metadata.create_all(bind=engine)
-    
-    # Create session factory
-    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-    
-    return SessionLocal
+def sample_audio_file():
+    """Create a fresh file-like wrapper around the sample audio bytes."""
+    # Uploads consume the stream, so only the cheap wrapper is rebuilt per test
+    return io.BytesIO(SAMPLE_AUDIO_BYTES)
+
+
+STORED_AUDIO_ID = "0123456789abcdef0123456789abcdef"
+
+
+def _mock_service(dependency, service_cls):
+    """Yield a spec'd mock bound to a voice service dependency until the module finishes."""
+    # spec turns the service's coroutine methods into AsyncMocks
+    mock_service = MagicMock(spec=service_cls)
+    app.dependency_overrides[dependency] = lambda: mock_service
+    yield mock_service
+    app.dependency_overrides.pop(dependency, None)
+
+
+@pytest.fixture(scope="module")
+def _whisper_mock():
+    """Whisper service mock shared by the tests in this module."""
+    yield from _mock_service(get_whisper_service, WhisperService)
+
+
+@pytest.fixture(scope="module")
+def _tts_mock():
+    """TTS service mock shared by the tests in this module."""
+    yield from _mock_service(get_tts_service, KokoroTTSService)
+
+
+@pytest.fixture(scope="module")
+def _hotword_mock():
+    """Hotword service mock shared by the tests in this module."""
+    yield from _mock_service(get_hotword_service, PorcupineHotwordService)
 
 
 @pytest.fixture
-def client(test_db):
-    """Create a test client with database override."""
-    def override_get_db():
-        db = test_db()
-        try:
-            yield db
-        finally:
-            db.close()
-    
-    app.dependency_overrides[get_database_session] = override_get_db
-    
-    with TestClient(app) as test_client:
-        yield test_client
-    
-    app.dependency_overrides.clear()
+def mock_whisper(_whisper_mock):
+    """Provide the Whisper service mock with a clean call history."""
+    _whisper_mock.reset_mock(return_value=True, side_effect=True)
+    return _whisper_mock
 
 
 @pytest.fixture
-def sample_audio_file():
-    """Create a sample audio file for testing."""
-    # Create a simple WAV-like file
-    audio_data = b"RIFF\x24\x08\x00\x00WAVEfmt \x10\x00\x00\x00" + b"\x00" * 100
-    
-    # Create a file-like object
-    audio_file = io.BytesIO(audio_data)
-    audio_file.name = "test_audio.wav"
-    
-    return audio_file
+def mock_tts(_tts_mock):
+    """Provide the TTS service mock with a clean call history."""
+    _tts_mock.reset_mock(return_value=True, side_effect=True)
+    _tts_mock.store_audio.return_value = STORED_AUDIO_ID
+    return _tts_mock
+
+
+@pytest.fixture
+def mock_hotword(_hotword_mock):
+    """Provide the hotword service mock with a clean call history."""
+    _hotword_mock.reset_mock(return_value=True, side_effect=True)
+    return _hotword_mock
 
 
 class TestVoiceTranscriptionAPI:
     """Test voice transcription API endpoints."""
     
-    def test_transcribe_audio_success(self, client, sample_audio_file):
-        """Test successful audio transcription."""
-        # Mock Whisper service
-        with patch('src.nlp_match_event_reporter.services.voice_processing.whisper_service') as mock_whisper:
-            mock_result = MagicMock()
-            mock_result.text = "Test transcription result"
-            mock_result.confidence = 0.95
-            mock_result.language = "sv"
-            mock_result.processing_time = 1.2
-            mock_whisper.transcribe_audio.return_value = mock_result
-            
-            # Make request
-            response = client.post(
-                "/api/v1/voice/transcribe",
-                files={"audio_file": ("test.wav", sample_audio_file, "audio/wav")},
-                data={"language": "sv"}
-            )
-            
-            assert response.status_code == 200
-            data = response.json()
-            
-            assert data["text"] == "Test transcription result"
-            assert data["confidence"] == 0.95
-            assert data["language"] == "sv"
-            assert data["duration"] == 1.2
-            assert "detected_events" in data
+    @pytest.mark.parametrize("form_data,result", [
+        pytest.param(
+            {"language": "sv"},
+            TranscriptionResult(
+                text="Test transcription result",
+                confidence=0.95,
+                language="sv",
+                processing_time=1.2,
+            ),
+            id="without-match",
+        ),
+        pytest.param(
+            {"language": "sv", "match_id": "1"},
+            TranscriptionResult(
+                text="Mål av Erik Karlsson i femtonde minuten",
+                confidence=0.92,
+                language="sv",
+                processing_time=1.5,
+            ),
+            id="with-match-id",
+        ),
+    ])
+    async def test_transcribe_audio_success(
+        self, client, sample_audio_file, db_session, mock_whisper, form_data, result
+    ):
+        """Test successful transcription and its processing log entry."""
+        mock_whisper.transcribe_audio.return_value = result
+        
+        response = await client.post(
+            "/api/v1/voice/transcribe",
+            files={"audio_file": ("test.wav", sample_audio_file, "audio/wav")},
+            data=form_data
+        )
+        
+        assert response.status_code == 200
+        data = response.json()
+        
+        assert data["text"] == result.text
+        assert data["confidence"] == result.confidence
+        assert data["language"] == result.language
+        assert data["duration"] == result.processing_time
+        assert "detected_events" in data
+        
+        # Check that log entry was created
+        log_entry = db_session.query(VoiceProcessingLog).filter_by(operation_type="transcribe").first()
+        
+        assert log_entry is not None
+        assert log_entry.status == "success"
+        assert log_entry.output_data == result.text
+        assert log_entry.confidence_score == result.confidence
+        assert log_entry.match_id == (int(form_data["match_id"]) if "match_id" in form_data else None)
+    
+    async def test_transcribe_audio_service_error(self, client, sample_audio_file, mock_whisper):
+        """Test transcription when service fails."""
+        mock_whisper.transcribe_audio.side_effect = VoiceProcessingError("Transcription failed")
+            
+        response = await client.post(
+            "/api/v1/voice/transcribe",
+            files={"audio_file": ("test.wav", sample_audio_file, "audio/wav")},
+            data={"language": "sv"}
+        )
+            
+        assert response.status_code == 500
+        assert "Transcription failed" in response.json()["detail"]
+
+
+class TestVoiceRequestValidation:
+    """Test requests the voice endpoints reject before touching the database."""
     
-    def test_transcribe_audio_invalid_file_type(self, client):
+    async def test_transcribe_audio_invalid_file_type(self, client_no_db):
         """Test transcription with invalid file type."""
         # Create a text file instead of audio
         text_file = io.BytesIO(b"This is not audio")
         text_file.name = "test.txt"
         
-        response = client.post(
+        response = await client_no_db.post(
             "/api/v1/voice/transcribe",
             files={"audio_file": ("test.txt", text_file, "text/plain")},
             data={"language": "sv"}
@@ -111,276 +198,251 @@ class TestVoiceTranscriptionAPI:
         assert response.status_code == 400
         assert "audio file" in response.json()["detail"]
     
-    def test_transcribe_audio_with_match_id(self, client, sample_audio_file):
-        """Test transcription with match ID for event extraction."""
-        with patch('src.nlp_match_event_reporter.services.voice_processing.whisper_service') as mock_whisper:
-            mock_result = MagicMock()
-            mock_result.text = "Mål av Erik Karlsson i femtonde minuten"
-            mock_result.confidence = 0.92
-            mock_result.language = "sv"
-            mock_result.processing_time = 1.5
-            mock_whisper.transcribe_audio.return_value = mock_result
-            
-            response = client.post(
-                "/api/v1/voice/transcribe",
-                files={"audio_file": ("test.wav", sample_audio_file, "audio/wav")},
-                data={"language": "sv", "match_id": "1"}
-            )
-            
-            assert response.status_code == 200
-            data = response.json()
-            
-            assert data["text"] == "Mål av Erik Karlsson i femtonde minuten"
-            assert "detected_events" in data
-    
-    def test_transcribe_audio_service_error(self, client, sample_audio_file):
-        """Test transcription when service fails."""
-        with patch('src.nlp_match_event_reporter.services.voice_processing.whisper_service') as mock_whisper:
-            from src.nlp_match_event_reporter.core.exceptions import VoiceProcessingError
-            mock_whisper.transcribe_audio.side_effect = VoiceProcessingError("Transcription failed")
-            
-            response = client.post(
-                "/api/v1/voice/transcribe",
-                files={"audio_file": ("test.wav", sample_audio_file, "audio/wav")},
-                data={"language": "sv"}
-            )
-            
-            assert response.status_code == 500
-            assert "Transcription failed" in response.json()["detail"]
+    async def test_text_to_speech_invalid_speed(self, client_no_db):
+        """Test TTS with invalid speed parameter."""
+        response = await client_no_db.post(
+            "/api/v1/voice/speak",
+            data={
+                "text": "Test text",
+                "speed": "3.5"  # Above maximum of 2.0
+            }
+        )
+        
+        assert response.status_code == 422  # Validation error
 
 
 class TestTextToSpeechAPI:
     """Test text-to-speech API endpoints."""
     
-    def test_text_to_speech_success(self, client):
+    async def test_text_to_speech_success(self, client, mock_tts):
         """Test successful text-to-speech conversion."""
-        with patch('src.nlp_match_event_reporter.services.voice_processing.tts_service') as mock_tts:
-            mock_result = MagicMock()
-            mock_result.audio_data = b"fake audio data"
-            mock_result.duration = 3.2
-            mock_result.processing_time = 0.8
-            mock_tts.synthesize_speech.return_value = mock_result
-            
-            response = client.post(
-                "/api/v1/voice/speak",
-                data={
-                    "text": "Hello world",
-                    "voice": "default",
-                    "speed": "1.0"
-                }
-            )
-            
-            assert response.status_code == 200
-            data = response.json()
-            
-            assert data["message"] == "Text converted to speech successfully"
-            assert data["duration"] == 3.2
-            assert data["voice_used"] == "default"
-            assert data["speed_used"] == 1.0
-            assert "audio_url" in data
+        mock_result = MagicMock()
+        mock_result.audio_data = b"fake audio data"
+        mock_result.duration = 3.2
+        mock_result.processing_time = 0.8
+        mock_tts.synthesize_speech.return_value = mock_result
+            
+        response = await client.post(
+            "/api/v1/voice/speak",
+            data={
+                "text": "Hello world",
+                "voice": "default",
+                "speed": "1.0"
+            }
+        )
+            
+        assert response.status_code == 200
+        data = response.json()
+            
+        assert data["message"] == "Text converted to speech successfully"
+        assert data["duration"] == 3.2
+        assert data["voice_used"] == "default"
+        assert data["speed_used"] == 1.0
+        assert data["audio_url"] == f"/api/v1/voice/speak/audio/{STORED_AUDIO_ID}"
+        mock_tts.store_audio.assert_called_once_with(mock_result)
     
-    def test_text_to_speech_custom_parameters(self, client):
+    async def test_text_to_speech_custom_parameters(self, client, mock_tts):
         """Test TTS with custom voice and speed parameters."""
-        with patch('src.nlp_match_event_reporter.services.voice_processing.tts_service') as mock_tts:
-            mock_result = MagicMock()
-            mock_result.audio_data = b"fake audio data"
-            mock_result.duration = 2.5
-            mock_result.processing_time = 0.6
-            mock_tts.synthesize_speech.return_value = mock_result
-            
-            response = client.post(
-                "/api/v1/voice/speak",
-                data={
-                    "text": "Custom voice test",
-                    "voice": "female",
-                    "speed": "1.5"
-                }
-            )
-            
-            assert response.status_code == 200
-            data = response.json()
-            
-            assert data["voice_used"] == "female"
-            assert data["speed_used"] == 1.5
-    
-    def test_text_to_speech_invalid_speed(self, client):
-        """Test TTS with invalid speed parameter."""
-        response = client.post(
+        mock_result = MagicMock()
+        mock_result.audio_data = b"fake audio data"
+        mock_result.duration = 2.5
+        mock_result.processing_time = 0.6
+        mock_tts.synthesize_speech.return_value = mock_result
+            
+        response = await client.post(
             "/api/v1/voice/speak",
             data={
-                "text": "Test text",
-                "speed": "3.5"  # Above maximum of 2.0
+                "text": "Custom voice test",
+                "voice": "female",
+                "speed": "1.5"
             }
         )
-        
-        assert response.status_code == 422  # Validation error
+            
+        assert response.status_code == 200
+        data = response.json()
+            
+        assert data["voice_used"] == "female"
+        assert data["speed_used"] == 1.5
     
-    def test_text_to_speech_service_error(self, client):
+    async def test_text_to_speech_service_error(self, client, mock_tts):
         """Test TTS when service fails."""
-        with patch('src.nlp_match_event_reporter.services.voice_processing.tts_service') as mock_tts:
-            from src.nlp_match_event_reporter.core.exceptions import VoiceProcessingError
-            mock_tts.synthesize_speech.side_effect = VoiceProcessingError("TTS synthesis failed")
+        mock_tts.synthesize_speech.side_effect = VoiceProcessingError("TTS synthesis failed")
             
-            response = client.post(
-                "/api/v1/voice/speak",
-                data={"text": "Test text"}
-            )
+        response = await client.post(
+            "/api/v1/voice/speak",
+            data={"text": "Test text"}
+        )
             
-            assert response.status_code == 500
-            assert "TTS synthesis failed" in response.json()["detail"]
+        assert response.status_code == 500
+        assert "TTS synthesis failed" in response.json()["detail"]
+
+    async def test_text_to_speech_audio_returns_wav(self, client, mock_tts):
+        """Test that the audio endpoint returns WAV bytes directly."""
+        mock_tts.synthesize_speech.return_value = TTSResult(
+            audio_data=bytes(3200),
+            sample_rate=16000,
+            duration=0.1,
+            processing_time=0.2,
+        )
+
+        response = await client.post(
+            "/api/v1/voice/speak/audio",
+            data={"text": "Hello world"}
+        )
+
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "audio/wav"
+        assert response.headers["content-length"] == str(len(response.content))
+        with wave.open(io.BytesIO(response.content), "rb") as wav:
+            assert wav.getframerate() == 16000
+            assert wav.getnframes() == 1600
+
+    async def test_get_speech_audio_serves_stored_rendering(self, client, db_session, mock_tts):
+        """Test that the audio_url from /speak returns the WAV without synthesizing or logging again."""
+        result = TTSResult(
+            audio_data=bytes(3200),
+            sample_rate=16000,
+            duration=0.1,
+            processing_time=0.2,
+        )
+        mock_tts.synthesize_speech.return_value = result
+        mock_tts.get_stored_audio.return_value = result
+
+        speak = await client.post("/api/v1/voice/speak", data={"text": "Hello world"})
+        logged = db_session.query(VoiceProcessingLog).filter_by(operation_type="tts").count()
+
+        response = await client.get(speak.json()["audio_url"])
+
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "audio/wav"
+        with wave.open(io.BytesIO(response.content), "rb") as wav:
+            assert wav.getframerate() == 16000
+            assert wav.getnframes() == 1600
+        mock_tts.get_stored_audio.assert_called_once_with(STORED_AUDIO_ID)
+        mock_tts.synthesize_speech.assert_awaited_once()
+        assert db_session.query(VoiceProcessingLog).filter_by(operation_type="tts").count() == logged
+
+    async def test_get_speech_audio_unknown_id(self, client, mock_tts):
+        """Test that an expired or unknown audio id returns 404."""
+        mock_tts.get_stored_audio.return_value = None
+
+        response = await client.get("/api/v1/voice/speak/audio/missing")
+
+        assert response.status_code == 404
 
 
 class TestHotwordDetectionAPI:
     """Test hotword detection API endpoints."""
     
-    def test_hotword_status_inactive(self, client):
+    async def test_hotword_status_inactive(self, client, mock_hotword):
         """Test hotword status when inactive."""
-        with patch('src.nlp_match_event_reporter.services.voice_processing.hotword_service') as mock_hotword:
-            mock_hotword.is_listening = False
-            mock_hotword._initialized = True
+        mock_hotword.is_listening = False
+        mock_hotword._initialized = True
             
-            response = client.get("/api/v1/voice/hotword/status")
+        response = await client.get("/api/v1/voice/hotword/status")
             
-            assert response.status_code == 200
-            data = response.json()
+        assert response.status_code == 200
+        data = response.json()
             
-            assert data["active"] is False
-            assert data["model_loaded"] is True
-            assert "sensitivity" in data
-            assert "detections_today" in data
+        assert data["active"] is False
+        assert data["model_loaded"] is True
+        assert "sensitivity" in data
+        assert "detections_today" in data
     
-    def test_hotword_status_active(self, client):
+    async def test_hotword_status_active(self, client, mock_hotword):
         """Test hotword status when active."""
-        with patch('src.nlp_match_event_reporter.services.voice_processing.hotword_service') as mock_hotword:
-            mock_hotword.is_listening = True
-            mock_hotword._initialized = True
+        mock_hotword.is_listening = True
+        mock_hotword._initialized = True
             
-            response = client.get("/api/v1/voice/hotword/status")
+        response = await client.get("/api/v1/voice/hotword/status")
             
-            assert response.status_code == 200
-            data = response.json()
+        assert response.status_code == 200
+        data = response.json()
             
-            assert data["active"] is True
-            assert data["model_loaded"] is True
+        assert data["active"] is True
+        assert data["model_loaded"] is True
     
-    def test_start_hotword_detection(self, client):
+    async def test_start_hotword_detection(self, client, mock_hotword):
         """Test starting hotword detection."""
-        with patch('src.nlp_match_event_reporter.services.voice_processing.hotword_service') as mock_hotword:
-            mock_hotword.is_listening = False
-            mock_hotword.start_listening.return_value = None
-            
-            response = client.post(
-                "/api/v1/voice/hotword/start",
-                data={
-                    "keywords": "referee,domare",
-                    "sensitivity": "0.7"
-                }
-            )
-            
-            assert response.status_code == 200
-            data = response.json()
-            
-            assert data["status"] == "active"
-            assert data["keywords"] == ["referee", "domare"]
-            assert data["sensitivity"] == 0.7
-            mock_hotword.start_listening.assert_called_once()
+        mock_hotword.is_listening = False
+        mock_hotword.start_listening.return_value = None
+            
+        response = await client.post(
+            "/api/v1/voice/hotword/start",
+            data={
+                "keywords": "referee,domare",
+                "sensitivity": "0.7"
+            }
+        )
+            
+        assert response.status_code == 200
+        data = response.json()
+            
+        assert data["status"] == "active"
+        assert data["keywords"] == ["referee", "domare"]
+        assert data["sensitivity"] == 0.7
+        mock_hotword.start_listening.assert_called_once()
     
-    def test_start_hotword_detection_already_active(self, client):
+    async def test_start_hotword_detection_already_active(self, client, mock_hotword):
         """Test starting hotword detection when already active."""
-        with patch('src.nlp_match_event_reporter.services.voice_processing.hotword_service') as mock_hotword:
-            mock_hotword.is_listening = True
+        mock_hotword.is_listening = True
             
-            response = client.post("/api/v1/voice/hotword/start")
+        response = await client.post("/api/v1/voice/hotword/start")
             
-            assert response.status_code == 200
-            data = response.json()
+        assert response.status_code == 200
+        data = response.json()
             
-            assert data["status"] == "active"
-            assert "already active" in data["message"]
+        assert data["status"] == "active"
+        assert "already active" in data["message"]
     
-    def test_stop_hotword_detection(self, client):
+    async def test_stop_hotword_detection(self, client, mock_hotword):
         """Test stopping hotword detection."""
-        with patch('src.nlp_match_event_reporter.services.voice_processing.hotword_service') as mock_hotword:
-            mock_hotword.is_listening = True
-            mock_hotword.stop_listening.return_value = None
+        mock_hotword.is_listening = True
+        mock_hotword.stop_listening.return_value = None
             
-            response = client.post("/api/v1/voice/hotword/stop")
+        response = await client.post("/api/v1/voice/hotword/stop")
             
-            assert response.status_code == 200
-            data = response.json()
+        assert response.status_code == 200
+        data = response.json()
             
-            assert data["status"] == "inactive"
-            mock_hotword.stop_listening.assert_called_once()
+        assert data["status"] == "inactive"
+        mock_hotword.stop_listening.assert_called_once()
     
-    def test_stop_hotword_detection_already_inactive(self, client):
+    async def test_stop_hotword_detection_already_inactive(self, client, mock_hotword):
         """Test stopping hotword detection when already inactive."""
-        with patch('src.nlp_match_event_reporter.services.voice_processing.hotword_service') as mock_hotword:
-            mock_hotword.is_listening = False
+        mock_hotword.is_listening = False
             
-            response = client.post("/api/v1/voice/hotword/stop")
+        response = await client.post("/api/v1/voice/hotword/stop")
             
-            assert response.status_code == 200
-            data = response.json()
+        assert response.status_code == 200
+        data = response.json()
             
-            assert data["status"] == "inactive"
-            assert "already inactive" in data["message"]
+        assert data["status"] == "inactive"
+        assert "already inactive" in data["message"]
 
 
 class TestVoiceLogging:
     """Test voice processing logging functionality."""
     
-    def test_transcription_logging(self, client, sample_audio_file, test_db):
-        """Test that transcription operations are logged to database."""
-        with patch('src.nlp_match_event_reporter.services.voice_processing.whisper_service') as mock_whisper:
-            mock_result = MagicMock()
-            mock_result.text = "Logged transcription"
-            mock_result.confidence = 0.88
-            mock_result.language = "sv"
-            mock_result.processing_time = 1.0
-            mock_whisper.transcribe_audio.return_value = mock_result
-            
-            response = client.post(
-                "/api/v1/voice/transcribe",
-                files={"audio_file": ("test.wav", sample_audio_file, "audio/wav")},
-                data={"language": "sv"}
-            )
-            
-            assert response.status_code == 200
-            
-            # Check that log entry was created
-            db = test_db()
-            log_entry = db.query(VoiceProcessingLog).filter_by(operation_type="transcribe").first()
-            
-            assert log_entry is not None
-            assert log_entry.status == "success"
-            assert log_entry.output_data == "Logged transcription"
-            assert log_entry.confidence_score == 0.88
-            
-            db.close()
-    
-    def test_tts_logging(self, client, test_db):
+    async def test_tts_logging(self, client, db_session, mock_tts):
         """Test that TTS operations are logged to database."""
-        with patch('src.nlp_match_event_reporter.services.voice_processing.tts_service') as mock_tts:
-            mock_result = MagicMock()
-            mock_result.audio_data = b"fake audio"
-            mock_result.duration = 2.0
-            mock_result.processing_time = 0.5
-            mock_tts.synthesize_speech.return_value = mock_result
-            
-            response = client.post(
-                "/api/v1/voice/speak",
-                data={"text": "Logged TTS test"}
-            )
-            
-            assert response.status_code == 200
-            
-            # Check that log entry was created
-            db = test_db()
-            log_entry = db.query(VoiceProcessingLog).filter_by(operation_type="tts").first()
-            
-            assert log_entry is not None
-            assert log_entry.status == "success"
-            assert log_entry.input_data == "Logged TTS test"
-            assert log_entry.processing_time_ms == 500
-            
-            db.close()
+        mock_result = MagicMock()
+        mock_result.audio_data = b"fake audio"
+        mock_result.duration = 2.0
+        mock_result.processing_time = 0.5
+        mock_tts.synthesize_speech.return_value = mock_result
+            
+        response = await client.post(
+            "/api/v1/voice/speak",
+            data={"text": "Logged TTS test"}
+        )
+            
+        assert response.status_code == 200
+            
+        # Check that log entry was created
+        log_entry = db_session.query(VoiceProcessingLog).filter_by(operation_type="tts").first()
+            
+        assert log_entry is not None
+        assert log_entry.status == "success"
+        assert log_entry.input_data == "Logged TTS test"
+        assert log_entry.processing_time_ms == 500
@@ -0,0 +1,14 @@
+"""
+Pytest fixtures shared by the unit tests.
+"""
+
+import pytest
+
+from src.nlp_match_event_reporter.core.config import settings
+
+
+@pytest.fixture(autouse=True)
+def fast_timeouts(monkeypatch):
+    """Shorten FOGIS request timeouts and sync intervals from their production defaults."""
+    monkeypatch.setattr(settings, "FOGIS_TIMEOUT_SECONDS", 1.0)
+    monkeypatch.setattr(settings, "SYNC_INTERVAL_SECONDS", 1)
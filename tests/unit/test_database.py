@@ -4,10 +4,9 @@ Unit tests for database models and operations.
 
 import pytest
 from datetime import datetime, timezone
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
-from sqlalchemy.pool import StaticPool
+from sqlalchemy import insert, inspect
 
+from src.nlp_match_event_reporter.core.database import DatabaseManager
 from src.nlp_match_event_reporter.models.database import (
     Base,
     Match,
@@ -18,28 +17,6 @@ from src.nlp_match_event_reporter.models.database import (
 )
 
 
-@pytest.fixture
-def db_session():
-    """Create a test database session."""
-    # Create in-memory SQLite database for testing
-    engine = create_engine(
-        "sqlite:///:memory:",
-        connect_args={"check_same_thread": False},
-        poolclass=StaticPool,
-    )
-    
-    # Create all tables
-    Base.metadata.create_all(bind=engine)
-    
-    # Create session
-    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-    session = SessionLocal()
-    
-    yield session
-    
-    session.close()
-
-
 def test_match_model(db_session):
     """Test Match model creation and relationships."""
     # Create a match
@@ -211,21 +188,11 @@ def test_match_event_cascade_delete(db_session):
     db_session.add(match)
     db_session.commit()
     
-    # Add events
-    event1 = Event(
-        match_id=match.id,
-        event_type="goal",
-        minute=10,
-        description="First goal",
-    )
-    event2 = Event(
-        match_id=match.id,
-        event_type="yellow_card",
-        minute=25,
-        description="Yellow card",
-    )
-    
-    db_session.add_all([event1, event2])
+    # Add events in one bulk insert
+    db_session.execute(insert(Event), [
+        {"match_id": match.id, "event_type": "goal", "minute": 10, "description": "First goal"},
+        {"match_id": match.id, "event_type": "yellow_card", "minute": 25, "description": "Yellow card"},
+    ])
     db_session.commit()
     
     # Verify events exist
@@ -240,41 +207,88 @@ def test_match_event_cascade_delete(db_session):
     assert len(remaining_events) == 0
 
 
-def test_database_indexes(db_session):
-    """Test that database indexes are working by querying indexed fields."""
-    # Create test data
-    match = Match(
-        home_team="Test Team 1",
-        away_team="Test Team 2",
-        match_date=datetime.now(timezone.utc),
-        venue="Test Venue",
-        competition="Test Competition",
-        status="active",
-        is_active=True,
-    )
-    db_session.add(match)
-    db_session.commit()
+def test_database_indexes():
+    """Test that frequently filtered columns are indexed."""
+    def indexed_columns(model):
+        return {
+            index.name: {column.name for column in index.columns}
+            for index in model.__table__.indexes
+        }
     
-    # Query by indexed fields (should work efficiently)
-    matches_by_status = db_session.query(Match).filter_by(status="active").all()
-    assert len(matches_by_status) == 1
+    match_indexes = indexed_columns(Match)
+    assert match_indexes["idx_match_status"] == {"status"}
+    assert match_indexes["idx_match_active"] == {"is_active"}
+    assert match_indexes["idx_match_date"] == {"match_date"}
+    assert match_indexes["ix_matches_fogis_match_id"] == {"fogis_match_id"}
     
-    matches_by_active = db_session.query(Match).filter_by(is_active=True).all()
-    assert len(matches_by_active) == 1
+    event_indexes = indexed_columns(Event)
+    assert event_indexes["idx_event_match_id"] == {"match_id"}
+    assert event_indexes["idx_event_type"] == {"event_type"}
+    assert event_indexes["idx_event_sync_status"] == {"synced_to_fogis"}
+
+
+def test_test_database_schema_matches_models(db_engine):
+    """Test that the precompiled test schema creates every model table and index."""
+    inspector = inspect(db_engine)
     
-    # Test event indexes
-    event = Event(
-        match_id=match.id,
-        event_type="goal",
-        minute=30,
-        description="Test goal",
-        synced_to_fogis=False,
-    )
-    db_session.add(event)
-    db_session.commit()
+    assert set(inspector.get_table_names()) == set(Base.metadata.tables)
+    for table in Base.metadata.sorted_tables:
+        created = {index["name"] for index in inspector.get_indexes(table.name)}
+        assert {index.name for index in table.indexes} <= created
+
+
+@pytest.fixture
+def db_manager():
+    """Create an initialized in-memory database manager."""
+    manager = DatabaseManager("sqlite:///:memory:")
+    manager.initialize()
+    manager.create_tables()
+    yield manager
+    manager.engine.dispose()
+
+
+async def test_async_session_commits_on_exit(db_manager):
+    """Test that async_session commits and keeps objects loaded."""
+    async with db_manager.async_session() as session:
+        user = User(username="referee1", email="referee1@example.com", hashed_password="x")
+        session.add(user)
     
-    events_by_type = db_session.query(Event).filter_by(event_type="goal").all()
-    assert len(events_by_type) == 1
+    # Attributes remain readable after the session is closed
+    assert user.username == "referee1"
     
-    events_by_sync = db_session.query(Event).filter_by(synced_to_fogis=False).all()
-    assert len(events_by_sync) == 1
+    session = db_manager.SessionLocal()
+    try:
+        assert session.query(User).filter(User.username == "referee1").count() == 1
+    finally:
+        session.close()
+
+
+async def test_async_session_rolls_back_on_error(db_manager):
+    """Test that async_session rolls back when the block raises."""
+    with pytest.raises(ValueError):
+        async with db_manager.async_session() as session:
+            session.add(User(username="referee2", email="referee2@example.com", hashed_password="x"))
+            session.flush()
+            raise ValueError("boom")
+    
+    session = db_manager.SessionLocal()
+    try:
+        assert session.query(User).filter(User.username == "referee2").count() == 0
+    finally:
+        session.close()
+
+
+async def test_connection_released_commits_and_reconnects(db_manager):
+    """Test that connection_released commits pending work and holds no transaction in its block."""
+    async with db_manager.async_session() as session:
+        session.add(User(username="referee3", email="referee3@example.com", hashed_password="x"))
+        
+        async with db_manager.connection_released(session):
+            assert not session.in_transaction()
+            other = db_manager.SessionLocal()
+            try:
+                assert other.query(User).filter(User.username == "referee3").count() == 1
+            finally:
+                other.close()
+        
+        assert session.in_transaction()
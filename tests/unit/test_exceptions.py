@@ -11,50 +11,19 @@ from src.nlp_match_event_reporter.core.exceptions import (
 )
 
 
-def test_nlp_reporter_error():
-    """Test base NLPReporterError exception."""
-    error = NLPReporterError("Test error message")
-    
-    assert str(error) == "Test error message"
-    assert isinstance(error, Exception)
-
-
-def test_fogis_integration_error():
-    """Test FOGISIntegrationError exception."""
-    error = FOGISIntegrationError("FOGIS API timeout")
-
-    assert str(error) == "FOGIS API timeout"
-    assert isinstance(error, NLPReporterError)
-
-
-def test_voice_processing_error():
-    """Test VoiceProcessingError exception."""
-    error = VoiceProcessingError("Speech recognition failed")
-
-    assert str(error) == "Speech recognition failed"
+@pytest.mark.parametrize("exception_class,message", [
+    (NLPReporterError, "Test error message"),
+    (FOGISIntegrationError, "FOGIS API timeout"),
+    (VoiceProcessingError, "Speech recognition failed"),
+    (EventProcessingError, "Event validation failed"),
+])
+def test_custom_exception(exception_class, message):
+    """Test that custom exceptions keep their message and share the NLPReporterError base."""
+    error = exception_class(message)
+
+    assert str(error) == message
     assert isinstance(error, NLPReporterError)
-
-
-def test_event_processing_error():
-    """Test EventProcessingError exception."""
-    error = EventProcessingError("Event validation failed")
-
-    assert str(error) == "Event validation failed"
-    assert isinstance(error, NLPReporterError)
-
-
-def test_exception_inheritance():
-    """Test that all custom exceptions inherit from NLPReporterError."""
-    exceptions = [
-        FOGISIntegrationError,
-        VoiceProcessingError,
-        EventProcessingError,
-    ]
-
-    for exception_class in exceptions:
-        error = exception_class("Test message")
-        assert isinstance(error, NLPReporterError)
-        assert isinstance(error, Exception)
+    assert isinstance(error, Exception)
 
 
 def test_exception_with_empty_message():
@@ -4,9 +4,16 @@ Unit tests for FOGIS client.
 
 import pytest
 import asyncio
+import dataclasses
+import json
+import time
+from types import SimpleNamespace
 from datetime import datetime, timezone
-from unittest.mock import patch, MagicMock, AsyncMock
+from unittest.mock import patch
 
+import httpx
+
+from src.nlp_match_event_reporter.services import fogis_client as fogis_client_module
 from src.nlp_match_event_reporter.services.fogis_client import (
     FOGISClient,
     FOGISSyncService,
@@ -16,134 +23,207 @@ from src.nlp_match_event_reporter.services.fogis_client import (
     convert_event_to_fogis_format,
     convert_fogis_match_to_internal,
 )
+from src.nlp_match_event_reporter.core.config import settings
 from src.nlp_match_event_reporter.core.exceptions import FOGISIntegrationError
 
+# Fixed timestamp keeps test data deterministic
+FIXED_NOW = datetime(2024, 1, 1, 12, 0, 0, tzinfo=timezone.utc)
+
+
+def _batch_results(events: list) -> dict:
+    """Build a successful FOGIS batch sync reply for the given events."""
+    return {
+        "results": [
+            {"success": True, "event_id": 99999, "message": "Event synced successfully"}
+            for _ in events
+        ]
+    }
+
+
+def _fogis_api(request: httpx.Request) -> httpx.Response:
+    """Answer FOGIS requests in-process so no test opens a socket."""
+    if request.url.path == "/events:batch":
+        events = json.loads(request.content)["events"]
+        return httpx.Response(200, json=_batch_results(events), request=request)
+    return httpx.Response(200, json={}, request=request)
+
+
+# Stands in for msgpack, which is an optional speedup; JSON keeps bodies readable
+FAKE_MSGPACK = SimpleNamespace(
+    packb=lambda data, **kwargs: json.dumps(data).encode(),
+    unpackb=lambda data, **kwargs: json.loads(data),
+)
+
 
 class TestFOGISClient:
     """Test cases for FOGISClient."""
     
     @pytest.fixture
-    def fogis_client(self):
-        """Create a FOGISClient instance."""
-        return FOGISClient()
+    async def fogis_client(self):
+        """Create a FOGISClient instance whose session uses a mock transport."""
+        client = FOGISClient(transport=httpx.MockTransport(_fogis_api))
+        yield client
+        await client.close()
+    
+    @pytest.fixture
+    async def fogis_client_authed(self, fogis_client):
+        """Create a FOGISClient instance that has already authenticated."""
+        await fogis_client.authenticate("test", "test")
+        return fogis_client
     
     def test_initialization(self, fogis_client):
         """Test FOGISClient initialization."""
         assert fogis_client.base_url == "https://fogis.svenskfotboll.se"
-        assert fogis_client.timeout == 30.0
+        assert fogis_client.timeout == settings.FOGIS_TIMEOUT_SECONDS
         assert fogis_client._session is None
         assert not fogis_client._authenticated
         assert fogis_client._auth_token is None
     
-    @pytest.mark.asyncio
     async def test_initialize_session(self, fogis_client):
         """Test session initialization."""
-        with patch('httpx.AsyncClient') as mock_client:
-            await fogis_client.initialize()
-            
-            assert fogis_client._session is not None
-            mock_client.assert_called_once()
+        await fogis_client.initialize()
+        
+        assert isinstance(fogis_client._session, httpx.AsyncClient)
+        response = await fogis_client._session.get("/matches")
+        assert response.status_code == 200
     
-    @pytest.mark.asyncio
     async def test_close_session(self, fogis_client):
         """Test session cleanup."""
         # Initialize first
-        with patch('httpx.AsyncClient') as mock_client:
-            mock_session = AsyncMock()
-            mock_client.return_value = mock_session
-            
-            await fogis_client.initialize()
-            await fogis_client.close()
-            
-            mock_session.aclose.assert_called_once()
-            assert fogis_client._session is None
+        await fogis_client.initialize()
+        session = fogis_client._session
+        await fogis_client.close()
+        
+        assert session.is_closed
+        assert fogis_client._session is None
     
-    @pytest.mark.asyncio
     async def test_context_manager(self, fogis_client):
         """Test async context manager."""
-        with patch('httpx.AsyncClient') as mock_client:
-            mock_session = AsyncMock()
-            mock_client.return_value = mock_session
-            
-            async with fogis_client as client:
-                assert client._session is not None
-            
-            mock_session.aclose.assert_called_once()
+        async with fogis_client as client:
+            session = client._session
+            assert session is not None
+        
+        assert session.is_closed
     
-    @pytest.mark.asyncio
     async def test_authenticate_success(self, fogis_client):
         """Test successful authentication."""
-        with patch('httpx.AsyncClient'):
-            result = await fogis_client.authenticate("test_user", "test_pass")
-            
-            assert result is True
-            assert fogis_client._authenticated is True
-            assert fogis_client._auth_token == "mock_auth_token_12345"
+        result = await fogis_client.authenticate("test_user", "test_pass")
+        
+        assert result is True
+        assert fogis_client._authenticated is True
+        assert fogis_client._auth_token == "mock_auth_token_12345"
     
-    @pytest.mark.asyncio
     async def test_get_matches_not_authenticated(self, fogis_client):
         """Test get_matches when not authenticated."""
         with pytest.raises(FOGISIntegrationError, match="Not authenticated"):
             await fogis_client.get_matches()
     
-    @pytest.mark.asyncio
-    async def test_get_matches_success(self, fogis_client):
+    async def test_get_matches_success(self, fogis_client_authed):
         """Test successful match fetching."""
-        # Authenticate first
-        with patch('httpx.AsyncClient'):
-            await fogis_client.authenticate("test", "test")
-            
-            matches = await fogis_client.get_matches(limit=10)
-            
-            assert len(matches) == 2
-            assert all(isinstance(match, FOGISMatch) for match in matches)
-            assert matches[0].home_team == "AIK"
-            assert matches[0].away_team == "Hammarby"
+        matches = await fogis_client_authed.get_matches(limit=10)
+        
+        assert len(matches) == 2
+        assert all(isinstance(match, FOGISMatch) for match in matches)
+        assert matches[0].home_team == "AIK"
+        assert matches[0].away_team == "Hammarby"
     
-    @pytest.mark.asyncio
-    async def test_get_match_success(self, fogis_client):
+    async def test_iter_matches_streams_matches(self, fogis_client_authed):
+        """Test that iter_matches yields matches one at a time."""
+        stream = fogis_client_authed.iter_matches(limit=1)
+        first = await stream.__anext__()
+        
+        assert isinstance(first, FOGISMatch)
+        assert first.match_id == 123456
+        with pytest.raises(StopAsyncIteration):
+            await stream.__anext__()
+    
+    async def test_get_match_success(self, fogis_client_authed):
         """Test successful single match fetching."""
-        with patch('httpx.AsyncClient'):
-            await fogis_client.authenticate("test", "test")
-            
-            match = await fogis_client.get_match(123456)
-            
-            assert match is not None
-            assert isinstance(match, FOGISMatch)
-            assert match.match_id == 123456
-            assert match.home_team == "AIK"
+        match = await fogis_client_authed.get_match(123456)
+        
+        assert match is not None
+        assert isinstance(match, FOGISMatch)
+        assert match.match_id == 123456
+        assert match.home_team == "AIK"
+    
+    async def test_shared_matches_are_immutable(self, fogis_client_authed):
+        """Test that matches handed out from the shared mock data cannot be modified."""
+        match = await fogis_client_authed.get_match(123456)
+        
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            match.status = "completed"
     
-    @pytest.mark.asyncio
-    async def test_get_match_not_found(self, fogis_client):
+    async def test_get_match_not_found(self, fogis_client_authed):
         """Test fetching non-existent match."""
-        with patch('httpx.AsyncClient'):
-            await fogis_client.authenticate("test", "test")
+        match = await fogis_client_authed.get_match(999999)
+        
+        assert match is None
+    
+    async def test_get_match_is_cached(self, fogis_client_authed):
+        """Test that repeated and concurrent lookups fetch a match once."""
+        with patch.object(fogis_client_authed, '_fetch_match', wraps=fogis_client_authed._fetch_match) as fetch:
+            first, second = await asyncio.gather(
+                fogis_client_authed.get_match(123456),
+                fogis_client_authed.get_match(123456),
+            )
+            third = await fogis_client_authed.get_match(123456)
+        
+        assert fetch.await_count == 1
+        assert first is second is third
+    
+    async def test_get_match_failure_is_not_cached(self, fogis_client_authed):
+        """Test that a failed fetch releases its lock and is retried on the next lookup."""
+        real_fetch = fogis_client_authed._fetch_match
+        failures = [FOGISIntegrationError("FOGIS unavailable")]
+        
+        async def flaky_fetch(match_id):
+            if failures:
+                raise failures.pop()
+            return await real_fetch(match_id)
+        
+        with patch.object(fogis_client_authed, '_fetch_match', side_effect=flaky_fetch) as fetch:
+            with pytest.raises(FOGISIntegrationError):
+                await fogis_client_authed.get_match(123456)
             
-            match = await fogis_client.get_match(999999)
+            assert 123456 not in fogis_client_authed._match_locks
+            assert 123456 not in fogis_client_authed._match_cache
             
-            assert match is None
+            match = await fogis_client_authed.get_match(123456)
+        
+        assert fetch.await_count == 2
+        assert match is not None
+        assert match.match_id == 123456
     
-    @pytest.mark.asyncio
-    async def test_sync_event_success(self, fogis_client):
-        """Test successful event synchronization."""
-        with patch('httpx.AsyncClient'):
-            await fogis_client.authenticate("test", "test")
-            
-            result = await fogis_client.sync_event(
+    async def test_get_match_cache_invalidated_by_sync(self, fogis_client_authed):
+        """Test that syncing an event drops the cached match."""
+        with patch.object(fogis_client_authed, '_fetch_match', wraps=fogis_client_authed._fetch_match) as fetch:
+            await fogis_client_authed.get_match(123456)
+            await fogis_client_authed.sync_event(
                 match_id=123456,
                 event_type="goal",
                 minute=15,
-                description="Goal by Test Player",
-                player_name="Test Player",
-                team="AIK"
+                description="Goal"
             )
-            
-            assert isinstance(result, FOGISSyncResult)
-            assert result.success is True
-            assert result.event_id == 99999
-            assert "successfully" in result.message
+            await fogis_client_authed.get_match(123456)
+        
+        assert fetch.await_count == 2
+    
+    async def test_sync_event_success(self, fogis_client_authed):
+        """Test successful event synchronization."""
+        result = await fogis_client_authed.sync_event(
+            match_id=123456,
+            event_type="goal",
+            minute=15,
+            description="Goal by Test Player",
+            player_name="Test Player",
+            team="AIK"
+        )
+        
+        assert isinstance(result, FOGISSyncResult)
+        assert result.success is True
+        assert result.event_id == 99999
+        assert "successfully" in result.message
     
-    @pytest.mark.asyncio
     async def test_sync_event_not_authenticated(self, fogis_client):
         """Test sync_event when not authenticated."""
         with pytest.raises(FOGISIntegrationError, match="Not authenticated"):
@@ -154,13 +234,150 @@ class TestFOGISClient:
                 description="Test goal"
             )
     
-    @pytest.mark.asyncio
+    async def test_sync_events_batch_success(self, fogis_client_authed):
+        """Test that a batch of events is synced in one request."""
+        events = [
+            {"match_id": 123456, "event_type": "goal", "minute": 15, "description": "Goal"},
+            {"match_id": 123456, "event_type": "card", "minute": 30, "description": "Card"},
+        ]
+        with patch.object(fogis_client_authed, '_post_events_batch', wraps=fogis_client_authed._post_events_batch) as post:
+            results = await fogis_client_authed.sync_events_batch(events)
+        
+        post.assert_awaited_once()
+        assert len(post.await_args.args[0]["events"]) == 2
+        assert [result.success for result in results] == [True, True]
+        assert fogis_client_authed._server_supports_batch is True
+    
+    async def test_accept_header_without_msgpack(self, fogis_client, monkeypatch):
+        """Test that only JSON is requested when msgpack is not installed."""
+        monkeypatch.setattr(fogis_client_module, "msgpack", None)
+        
+        await fogis_client.initialize()
+        
+        assert fogis_client._session.headers["Accept"] == "application/json"
+    
+    async def test_batch_sync_negotiates_msgpack(self, monkeypatch):
+        """Test that a msgpack reply switches later request bodies to msgpack."""
+        monkeypatch.setattr(fogis_client_module, "msgpack", FAKE_MSGPACK)
+        requests = []
+        
+        def fogis_api(request):
+            requests.append(request)
+            events = json.loads(request.content)["events"]
+            return httpx.Response(
+                200,
+                content=FAKE_MSGPACK.packb(_batch_results(events)),
+                headers={"Content-Type": "application/x-msgpack"},
+                request=request,
+            )
+        
+        client = FOGISClient(transport=httpx.MockTransport(fogis_api))
+        await client.authenticate("test", "test")
+        events = [{"match_id": 123456, "event_type": "goal", "minute": 15, "description": "Goal"}]
+        try:
+            first = await client.sync_events_batch(events)
+            second = await client.sync_events_batch(events)
+        finally:
+            await client.close()
+        
+        assert requests[0].headers["Accept"] == "application/x-msgpack, application/json;q=0.8"
+        assert requests[0].headers["Content-Type"] == "application/json"
+        assert requests[1].headers["Content-Type"] == "application/x-msgpack"
+        assert client._server_supports_msgpack is True
+        assert first[0].success and second[0].success
+    
+    async def test_batch_sync_json_reply_disables_msgpack(self, fogis_client_authed, monkeypatch):
+        """Test that a JSON reply keeps the client on JSON."""
+        monkeypatch.setattr(fogis_client_module, "msgpack", FAKE_MSGPACK)
+        events = [{"match_id": 123456, "event_type": "goal", "minute": 15, "description": "Goal"}]
+        
+        results = await fogis_client_authed.sync_events_batch(events)
+        
+        assert results[0].success
+        assert fogis_client_authed._server_supports_msgpack is False
+        assert fogis_client_authed._session.headers["Accept"] == "application/json"
+    
+    async def test_not_acceptable_retries_as_json(self, monkeypatch):
+        """Test that a 406 reply falls back to JSON and retries once."""
+        monkeypatch.setattr(fogis_client_module, "msgpack", FAKE_MSGPACK)
+        accept_headers = []
+        
+        def fogis_api(request):
+            accept_headers.append(request.headers["Accept"])
+            if "msgpack" in request.headers["Accept"]:
+                return httpx.Response(406, request=request)
+            return _fogis_api(request)
+        
+        client = FOGISClient(transport=httpx.MockTransport(fogis_api))
+        await client.authenticate("test", "test")
+        events = [{"match_id": 123456, "event_type": "goal", "minute": 15, "description": "Goal"}]
+        try:
+            results = await client.sync_events_batch(events)
+        finally:
+            await client.close()
+        
+        assert len(accept_headers) == 2
+        assert accept_headers[1] == "application/json"
+        assert results[0].success
+    
+    async def test_sync_events_batch_falls_back_without_endpoint(self, fogis_client_authed):
+        """Test that a 404 from the batch endpoint falls back to per-event sync."""
+        request = httpx.Request("POST", "https://fogis.svenskfotboll.se/events:batch")
+        not_found = httpx.HTTPStatusError(
+            "Not Found", request=request, response=httpx.Response(404, request=request)
+        )
+        events = [{"match_id": 123456, "event_type": "goal", "minute": 15, "description": "Goal"}]
+        with patch.object(fogis_client_authed, '_post_events_batch', side_effect=not_found) as post:
+            results = await fogis_client_authed.sync_events_batch(events)
+            await fogis_client_authed.sync_events_batch(events)
+        
+        assert post.await_count == 1
+        assert results[0].success is True
+        assert fogis_client_authed._server_supports_batch is False
+    
+    async def test_sync_events_batch_opens_breaker_on_server_errors(self, fogis_client_authed):
+        """Test that repeated 5xx responses short-circuit batch sync."""
+        request = httpx.Request("POST", "https://fogis.svenskfotboll.se/events:batch")
+        server_error = httpx.HTTPStatusError(
+            "Service Unavailable", request=request, response=httpx.Response(503, request=request)
+        )
+        events = [{"match_id": 123456, "event_type": "goal", "minute": 15, "description": "Goal"}]
+        with patch.object(fogis_client_authed, '_post_events_batch', side_effect=server_error):
+            for _ in range(5):
+                results = await fogis_client_authed.sync_events_batch(events)
+                assert results[0].message == "503 Service Unavailable"
+            
+            with pytest.raises(FOGISIntegrationError, match="circuit breaker"):
+                await fogis_client_authed.sync_events_batch(events)
+    
+    async def test_sync_events_batch_breaker_counts_afresh_after_cool_down(self, fogis_client_authed):
+        """Test that a single 5xx after the cool-down does not reopen the breaker."""
+        request = httpx.Request("POST", "https://fogis.svenskfotboll.se/events:batch")
+        server_error = httpx.HTTPStatusError(
+            "Service Unavailable", request=request, response=httpx.Response(503, request=request)
+        )
+        events = [{"match_id": 123456, "event_type": "goal", "minute": 15, "description": "Goal"}]
+        with patch.object(fogis_client_authed, '_post_events_batch', side_effect=server_error):
+            for _ in range(5):
+                await fogis_client_authed.sync_events_batch(events)
+            assert fogis_client_authed._batch_server_errors == 0
+            
+            # Let the cool-down run out
+            fogis_client_authed._breaker_open_until = time.monotonic() - 1
+            results = await fogis_client_authed.sync_events_batch(events)
+            
+            assert results[0].message == "503 Service Unavailable"
+            assert fogis_client_authed._breaker_open_until < time.monotonic()
+            assert fogis_client_authed._batch_server_errors == 1
+    
     async def test_health_check_success(self, fogis_client):
         """Test successful health check."""
         result = await fogis_client.health_check()
         assert result is True
+        # The session it opens is wired to the mock transport, never a real socket
+        response = await fogis_client._session.get("/")
+        assert response.status_code == 200
     
-    @pytest.mark.asyncio
     async def test_health_check_failure(self, fogis_client):
         """Test health check failure."""
         with patch.object(fogis_client, 'initialize', side_effect=Exception("Connection failed")):
@@ -176,25 +393,37 @@ class TestFOGISSyncService:
         """Create a FOGISSyncService instance."""
         return FOGISSyncService()
     
+    @pytest.fixture
+    def create_task(self):
+        """Replace the sync loop task with a bare future so no loop iteration runs."""
+        def fake_create_task(coro):
+            coro.close()
+            return asyncio.get_running_loop().create_future()
+        
+        with patch(
+            "src.nlp_match_event_reporter.services.fogis_client.asyncio.create_task",
+            side_effect=fake_create_task,
+        ) as create_task:
+            yield create_task
+    
     def test_initialization(self, sync_service):
         """Test FOGISSyncService initialization."""
         assert sync_service._sync_task is None
         assert not sync_service._is_running
-        assert sync_service._sync_interval == 30.0
+        assert sync_service._sync_interval == settings.SYNC_INTERVAL_SECONDS
     
-    @pytest.mark.asyncio
-    async def test_start_background_sync(self, sync_service):
+    async def test_start_background_sync(self, sync_service, create_task):
         """Test starting background sync."""
         await sync_service.start_background_sync()
         
         assert sync_service.is_running is True
         assert sync_service._sync_task is not None
+        assert create_task.call_count == 1
         
         # Cleanup
         await sync_service.stop_background_sync()
     
-    @pytest.mark.asyncio
-    async def test_stop_background_sync(self, sync_service):
+    async def test_stop_background_sync(self, sync_service, create_task):
         """Test stopping background sync."""
         # Start first
         await sync_service.start_background_sync()
@@ -205,21 +434,20 @@ class TestFOGISSyncService:
         assert sync_service.is_running is False
         assert sync_service._sync_task is None
     
-    @pytest.mark.asyncio
-    async def test_start_already_running(self, sync_service):
+    async def test_start_already_running(self, sync_service, create_task):
         """Test starting sync when already running."""
         await sync_service.start_background_sync()
         
         # Try to start again
         await sync_service.start_background_sync()
         
-        # Should still be running
+        # Should still be running, on the first task
         assert sync_service.is_running is True
+        assert create_task.call_count == 1
         
         # Cleanup
         await sync_service.stop_background_sync()
     
-    @pytest.mark.asyncio
     async def test_stop_not_running(self, sync_service):
         """Test stopping sync when not running."""
         # Should not raise error
@@ -239,7 +467,7 @@ class TestDataStructures:
     
     def test_fogis_match_creation(self):
         """Test FOGISMatch creation."""
-        match_date = datetime.now(timezone.utc)
+        match_date = FIXED_NOW
         
         match = FOGISMatch(
             match_id=123456,
@@ -261,7 +489,7 @@ class TestDataStructures:
     
     def test_fogis_event_creation(self):
         """Test FOGISEvent creation."""
-        timestamp = datetime.now(timezone.utc)
+        timestamp = FIXED_NOW
         
         event = FOGISEvent(
             event_id=999,
@@ -284,7 +512,7 @@ class TestDataStructures:
     
     def test_fogis_sync_result_creation(self):
         """Test FOGISSyncResult creation."""
-        sync_time = datetime.now(timezone.utc)
+        sync_time = FIXED_NOW
         
         result = FOGISSyncResult(
             success=True,
@@ -323,9 +551,19 @@ class TestUtilityFunctions:
         assert fogis_format["team"] == "AIK"
         assert "timestamp" in fogis_format
     
+    def test_convert_event_to_fogis_format_reuses_timestamp(self):
+        """Test that a shared timestamp is used instead of the current time."""
+        timestamp = "2025-08-20T19:00:00+00:00"
+        
+        first = convert_event_to_fogis_format({"event_type": "goal"}, timestamp=timestamp)
+        second = convert_event_to_fogis_format({"event_type": "card"}, timestamp=timestamp)
+        
+        assert first["timestamp"] == timestamp
+        assert second["timestamp"] == timestamp
+    
     def test_convert_fogis_match_to_internal(self):
         """Test FOGIS match to internal format conversion."""
-        match_date = datetime.now(timezone.utc)
+        match_date = FIXED_NOW
         
         fogis_match = FOGISMatch(
             match_id=123456,
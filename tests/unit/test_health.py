@@ -3,12 +3,12 @@ Unit tests for health check endpoints.
 """
 
 import pytest
-from fastapi.testclient import TestClient
+import httpx
 
 
-def test_basic_health_check(client: TestClient):
+async def test_basic_health_check(aclient: httpx.AsyncClient):
     """Test basic health check endpoint."""
-    response = client.get("/api/v1/health/")
+    response = await aclient.get("/api/v1/health/")
     
     assert response.status_code == 200
     data = response.json()
@@ -18,9 +18,9 @@ def test_basic_health_check(client: TestClient):
     assert "environment" in data
 
 
-def test_detailed_health_check(client: TestClient):
+async def test_detailed_health_check(aclient: httpx.AsyncClient):
     """Test detailed health check endpoint."""
-    response = client.get("/api/v1/health/detailed")
+    response = await aclient.get("/api/v1/health/detailed")
     
     assert response.status_code == 200
     data = response.json()
@@ -45,9 +45,9 @@ def test_detailed_health_check(client: TestClient):
     assert "tts_engine" in config
 
 
-def test_readiness_check(client: TestClient):
+async def test_readiness_check(aclient: httpx.AsyncClient):
     """Test readiness check endpoint."""
-    response = client.get("/api/v1/health/ready")
+    response = await aclient.get("/api/v1/health/ready")
     
     assert response.status_code == 200
     data = response.json()
@@ -55,9 +55,9 @@ def test_readiness_check(client: TestClient):
     assert data["status"] == "ready"
 
 
-def test_liveness_check(client: TestClient):
+async def test_liveness_check(aclient: httpx.AsyncClient):
     """Test liveness check endpoint."""
-    response = client.get("/api/v1/health/live")
+    response = await aclient.get("/api/v1/health/live")
     
     assert response.status_code == 200
     data = response.json()
@@ -65,9 +65,9 @@ def test_liveness_check(client: TestClient):
     assert data["status"] == "alive"
 
 
-def test_root_health_check(client: TestClient):
+async def test_root_health_check(aclient: httpx.AsyncClient):
     """Test root health check endpoint."""
-    response = client.get("/health")
+    response = await aclient.get("/health")
     
     assert response.status_code == 200
     data = response.json()
@@ -0,0 +1,428 @@
+"""
+Unit tests for match synchronization service.
+"""
+
+import pytest
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from unittest.mock import AsyncMock, MagicMock
+
+from loguru import logger
+
+from src.nlp_match_event_reporter.core.database import DatabaseManager
+from src.nlp_match_event_reporter.core.exceptions import FOGISIntegrationError
+from src.nlp_match_event_reporter.models.database import Match, Event
+from src.nlp_match_event_reporter.services import match_sync
+from src.nlp_match_event_reporter.services.fogis_client import FOGISMatch, FOGISSyncResult
+from src.nlp_match_event_reporter.services.match_sync import MatchSyncService
+
+
+def make_fogis_match(match_id: int, status: str = "scheduled") -> FOGISMatch:
+    """Build a FOGISMatch for testing."""
+    return FOGISMatch(
+        match_id=match_id,
+        home_team="AIK",
+        away_team="Hammarby",
+        home_team_id=1001,
+        away_team_id=1002,
+        match_date=datetime(2025, 8, 20, 19, 0, tzinfo=timezone.utc),
+        venue="Friends Arena",
+        competition="Allsvenskan",
+        status=status,
+    )
+
+
+async def stream(matches):
+    """Yield matches as an async iterator."""
+    for match in matches:
+        yield match
+
+
+@pytest.fixture
+def test_db_manager(monkeypatch):
+    """Point the match sync service at an in-memory database."""
+    manager = DatabaseManager("sqlite:///:memory:")
+    manager.initialize()
+    manager.create_tables()
+    monkeypatch.setattr(match_sync, "db_manager", manager)
+    yield manager
+    manager.engine.dispose()
+
+
+@pytest.fixture
+def log_records():
+    """Capture loguru records emitted during the test."""
+    records = []
+    handler_id = logger.add(lambda message: records.append(message.record), level="DEBUG")
+    yield records
+    logger.remove(handler_id)
+
+
+@pytest.fixture
+def sync_service():
+    """Create a MatchSyncService instance."""
+    return MatchSyncService()
+
+
+@pytest.fixture
+def unsynced_event_id(test_db_manager):
+    """Create a match with one event that has not been synced to FOGIS."""
+    db = test_db_manager.SessionLocal()
+    try:
+        match = Match(
+            fogis_match_id=123456,
+            home_team="AIK",
+            away_team="Hammarby",
+            match_date=datetime(2025, 8, 20, 19, 0, tzinfo=timezone.utc),
+            venue="Friends Arena",
+            competition="Allsvenskan",
+        )
+        db.add(match)
+        db.flush()
+        event = Event(
+            match_id=match.id,
+            event_type="goal",
+            minute=15,
+            description="Goal scored",
+        )
+        db.add(event)
+        db.commit()
+        return event.id
+    finally:
+        db.close()
+
+
+@pytest.fixture
+def mock_client(sync_service):
+    """Replace the FOGIS client used by the sync service."""
+    client = MagicMock()
+    client._authenticated = True
+    client.sync_event = AsyncMock()
+    sync_service.client = client
+    return client
+
+
+def make_sync_result(success: bool, message: str) -> FOGISSyncResult:
+    """Build a FOGISSyncResult for testing."""
+    return FOGISSyncResult(
+        success=success,
+        event_id=99999 if success else None,
+        message=message,
+        sync_time=datetime.now(timezone.utc),
+        attempts=1,
+    )
+
+
+async def test_sync_matches_to_db_creates_and_updates(sync_service, test_db_manager):
+    """Test that streamed matches are created, then updated on resync."""
+    async with test_db_manager.async_session() as db:
+        result = await sync_service._sync_matches_to_db(
+            db, stream([make_fogis_match(1), make_fogis_match(2)])
+        )
+    
+    assert result["success"] is True
+    assert result["matches_synced"] == 2
+    assert result["matches_created"] == 2
+    assert result["matches_updated"] == 0
+    
+    async with test_db_manager.async_session() as db:
+        result = await sync_service._sync_matches_to_db(
+            db, stream([make_fogis_match(1, status="active")])
+        )
+    
+    assert result["matches_created"] == 0
+    assert result["matches_updated"] == 1
+    
+    db = test_db_manager.SessionLocal()
+    try:
+        match = db.query(Match).filter(Match.fogis_match_id == 1).one()
+        assert match.status == "active"
+        assert db.query(Match).count() == 2
+    finally:
+        db.close()
+
+
+async def test_sync_matches_to_db_skips_unchanged(sync_service, test_db_manager):
+    """Test that matches whose content hash is unchanged are not updated."""
+    async with test_db_manager.async_session() as db:
+        await sync_service._sync_matches_to_db(db, stream([make_fogis_match(1), make_fogis_match(2)]))
+    
+    async with test_db_manager.async_session() as db:
+        result = await sync_service._sync_matches_to_db(
+            db, stream([make_fogis_match(1), make_fogis_match(2, status="active")])
+        )
+    
+    assert result["matches_synced"] == 2
+    assert result["matches_created"] == 0
+    assert result["matches_updated"] == 1
+    assert result["matches_unchanged"] == 1
+    
+    db = test_db_manager.SessionLocal()
+    try:
+        hashes = dict(db.query(Match.fogis_match_id, Match.version_hash).all())
+        assert hashes[1] is not None
+        assert hashes[1] != hashes[2]
+    finally:
+        db.close()
+
+
+async def test_sync_matches_to_db_batches(sync_service, test_db_manager, monkeypatch):
+    """Test that matches spanning several batches are all synced."""
+    monkeypatch.setattr(match_sync, "SYNC_BATCH_SIZE", 2)
+    
+    async with test_db_manager.async_session() as db:
+        result = await sync_service._sync_matches_to_db(
+            db, stream([make_fogis_match(match_id) for match_id in range(1, 6)])
+        )
+    
+    assert result["success"] is True
+    assert result["matches_synced"] == 5
+    assert result["matches_created"] == 5
+
+
+async def test_sync_matches_to_db_propagates_fogis_errors(sync_service, test_db_manager):
+    """Test that FOGIS errors raised mid-stream are not reported as database errors."""
+    async def failing_stream():
+        yield make_fogis_match(1)
+        raise FOGISIntegrationError("Connection lost")
+    
+    async with test_db_manager.async_session() as db:
+        with pytest.raises(FOGISIntegrationError):
+            await sync_service._sync_matches_to_db(db, failing_stream())
+
+
+async def test_sync_matches_from_fogis_error_result_has_all_counts(sync_service, mock_client, test_db_manager):
+    """Test that a failed sync reports the same count keys as a successful one."""
+    async def failing_stream():
+        raise FOGISIntegrationError("Connection lost")
+        yield
+    
+    mock_client.iter_matches = MagicMock(return_value=failing_stream())
+    
+    async with test_db_manager.async_session() as db:
+        result = await sync_service.sync_matches_from_fogis(db)
+    
+    assert result["success"] is False
+    assert result["matches_unchanged"] == 0
+    assert {"matches_synced", "matches_created", "matches_updated"} <= result.keys()
+
+
+async def test_sync_matches_to_db_error_result_has_all_counts(sync_service, test_db_manager, monkeypatch):
+    """Test that a database failure reports the same count keys as a successful sync."""
+    def failing_upsert(db, batch, errors):
+        raise RuntimeError("disk I/O error")
+    
+    monkeypatch.setattr(sync_service, "_upsert_match_batch", failing_upsert)
+    
+    async with test_db_manager.async_session() as db:
+        result = await sync_service._sync_matches_to_db(db, stream([make_fogis_match(1)]))
+    
+    assert result["success"] is False
+    assert result["matches_unchanged"] == 0
+
+
+def test_backoff_delay_is_jittered_and_capped():
+    """Test that retry delays follow the capped table with jitter."""
+    for attempt in range(20):
+        base = match_sync._BACKOFF[min(attempt, len(match_sync._BACKOFF) - 1)]
+        delay = match_sync._backoff_delay(attempt)
+        assert base * 0.8 <= delay <= base * 1.2
+        assert delay <= 30.0 * 1.2
+
+
+async def test_sync_event_retries_transient_failures(
+    sync_service, mock_client, unsynced_event_id, monkeypatch
+):
+    """Test that transient FOGIS failures are retried with backoff."""
+    sleep = AsyncMock()
+    monkeypatch.setattr(match_sync.asyncio, "sleep", sleep)
+    mock_client.sync_event.side_effect = [
+        make_sync_result(False, "Sync failed: timeout"),
+        make_sync_result(True, "Event synced successfully"),
+    ]
+    
+    result = await sync_service.sync_event_to_fogis(unsynced_event_id)
+    
+    assert result["success"] is True
+    assert result["attempts"] == 2
+    sleep.assert_awaited_once()
+
+
+async def test_sync_event_releases_session_during_fogis_calls(
+    sync_service, mock_client, unsynced_event_id, test_db_manager, monkeypatch
+):
+    """Test that no database session stays open across FOGIS calls and backoff sleeps."""
+    open_sessions = 0
+    session_factory = test_db_manager.async_session
+    
+    @asynccontextmanager
+    async def counting_session():
+        nonlocal open_sessions
+        open_sessions += 1
+        try:
+            async with session_factory() as db:
+                yield db
+        finally:
+            open_sessions -= 1
+    
+    async def sleep(delay):
+        assert open_sessions == 0
+    
+    async def sync_event(**payload):
+        assert open_sessions == 0
+        return make_sync_result(mock_client.sync_event.await_count > 1, "Sync failed: timeout")
+    
+    monkeypatch.setattr(test_db_manager, "async_session", counting_session)
+    monkeypatch.setattr(match_sync.asyncio, "sleep", sleep)
+    mock_client.sync_event.side_effect = sync_event
+    
+    result = await sync_service.sync_event_to_fogis(unsynced_event_id)
+    
+    assert result["success"] is True
+    assert mock_client.sync_event.await_count == 2
+    
+    db = test_db_manager.SessionLocal()
+    try:
+        assert db.get(Event, unsynced_event_id).synced_to_fogis is True
+    finally:
+        db.close()
+
+
+async def test_sync_event_does_not_retry_permanent_failures(
+    sync_service, mock_client, unsynced_event_id, test_db_manager, monkeypatch
+):
+    """Test that non-retryable FOGIS responses stop the retry loop."""
+    sleep = AsyncMock()
+    monkeypatch.setattr(match_sync.asyncio, "sleep", sleep)
+    mock_client.sync_event.return_value = make_sync_result(False, "422 Unprocessable Entity")
+    
+    result = await sync_service.sync_event_to_fogis(unsynced_event_id)
+    
+    assert result["success"] is False
+    assert result["attempts"] == 1
+    assert mock_client.sync_event.await_count == 1
+    sleep.assert_not_awaited()
+    
+    db = test_db_manager.SessionLocal()
+    try:
+        event = db.get(Event, unsynced_event_id)
+        assert event.sync_error == "422 Unprocessable Entity"
+    finally:
+        db.close()
+
+
+async def test_sync_once_batches_events(
+    sync_service, mock_client, unsynced_event_id, test_db_manager, log_records
+):
+    """Test that one sync pass commits matches and batched event results."""
+    db = test_db_manager.SessionLocal()
+    try:
+        failing = Event(match_id=1, event_type="card", minute=30, description="Yellow card")
+        db.add(failing)
+        db.commit()
+        failing_id = failing.id
+    finally:
+        db.close()
+    
+    mock_client.sync_events_batch = AsyncMock(return_value=[
+        make_sync_result(True, "Event synced successfully"),
+        make_sync_result(False, "Sync failed: boom"),
+    ])
+    mock_client.iter_matches = MagicMock(
+        return_value=stream([make_fogis_match(654321, "scheduled")])
+    )
+    
+    await sync_service.sync_once()
+    
+    mock_client.sync_events_batch.assert_awaited_once()
+    summaries = [
+        record for record in log_records
+        if record["message"].startswith("sync_complete")
+    ]
+    assert len(summaries) == 1
+    assert summaries[0]["extra"]["matches_created"] == 1
+    assert summaries[0]["extra"]["events_synced"] == 1
+    assert summaries[0]["extra"]["events_failed"] == 1
+    payload = mock_client.sync_events_batch.await_args.args[0]
+    assert [item["minute"] for item in payload] == [15, 30]
+    assert all(item["match_id"] == 123456 for item in payload)
+    
+    db = test_db_manager.SessionLocal()
+    try:
+        assert db.query(Match).filter(Match.fogis_match_id == 654321).count() == 1
+        assert db.get(Event, unsynced_event_id).synced_to_fogis is True
+        failing = db.get(Event, failing_id)
+        assert failing.synced_to_fogis is False
+        assert failing.sync_attempts == 1
+        assert failing.sync_error == "Sync failed: boom"
+    finally:
+        db.close()
+
+
+async def test_sync_once_shares_one_session_released_around_fogis_calls(
+    sync_service, mock_client, unsynced_event_id, test_db_manager, monkeypatch
+):
+    """Test that a sync pass uses one session that holds no transaction during FOGIS calls."""
+    sessions = []
+    session_factory = test_db_manager.async_session
+    
+    @asynccontextmanager
+    async def recording_session():
+        async with session_factory() as db:
+            sessions.append(db)
+            yield db
+    
+    async def fogis_stream():
+        assert not sessions[0].in_transaction()
+        yield make_fogis_match(654321, "scheduled")
+        assert not sessions[0].in_transaction()
+    
+    async def sync_events_batch(payload):
+        assert not sessions[0].in_transaction()
+        return [make_sync_result(True, "Event synced successfully") for _ in payload]
+    
+    monkeypatch.setattr(test_db_manager, "async_session", recording_session)
+    mock_client.iter_matches = MagicMock(return_value=fogis_stream())
+    mock_client.sync_events_batch = AsyncMock(side_effect=sync_events_batch)
+    
+    await sync_service.sync_once()
+    
+    assert len(sessions) == 1
+    mock_client.sync_events_batch.assert_awaited_once()
+    db = test_db_manager.SessionLocal()
+    try:
+        assert db.query(Match).filter(Match.fogis_match_id == 654321).count() == 1
+        assert db.get(Event, unsynced_event_id).synced_to_fogis is True
+    finally:
+        db.close()
+
+async def test_sync_events_batch_result_count_mismatch_fails_every_event(
+    sync_service, mock_client, unsynced_event_id, test_db_manager
+):
+    """Test that a short FOGIS batch reply is recorded as a failure for every event."""
+    db = test_db_manager.SessionLocal()
+    try:
+        second = Event(match_id=1, event_type="card", minute=30, description="Yellow card")
+        db.add(second)
+        db.commit()
+        second_id = second.id
+    finally:
+        db.close()
+    
+    mock_client.sync_events_batch = AsyncMock(return_value=[
+        make_sync_result(True, "Event synced successfully"),
+    ])
+    
+    async with test_db_manager.async_session() as db:
+        result = await sync_service._sync_events_batch(db, [unsynced_event_id, second_id])
+    
+    assert result == {"success": False, "events_synced": 0, "events_failed": 2}
+    db = test_db_manager.SessionLocal()
+    try:
+        for event_id in (unsynced_event_id, second_id):
+            event = db.get(Event, event_id)
+            assert event.synced_to_fogis is False
+            assert event.sync_attempts == 1
+            assert event.sync_error == "FOGIS returned 1 results for 2 events"
+    finally:
+        db.close()
@@ -4,85 +4,38 @@ Unit tests for match endpoints.
 
 import pytest
 from datetime import datetime, timezone, timedelta
-from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
-from sqlalchemy.pool import StaticPool
+import httpx
+from sqlalchemy import insert
 
-from src.nlp_match_event_reporter.main import app
-from src.nlp_match_event_reporter.models.database import Base, Match
-from src.nlp_match_event_reporter.core.database import get_database_session
+from src.nlp_match_event_reporter.models.database import Match
 
-
-@pytest.fixture
-def test_db():
-    """Create a test database."""
-    # Create in-memory SQLite database for testing
-    engine = create_engine(
-        "sqlite:///:memory:",
-        connect_args={"check_same_thread": False},
-        poolclass=StaticPool,
-    )
-
-    # Create all tables
-    Base.metadata.create_all(bind=engine)
-
-    # Create session factory
-    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-
-    return SessionLocal
-
-
-@pytest.fixture
-def client(test_db):
-    """Create a test client with database override."""
-    def override_get_db():
-        db = test_db()
-        try:
-            yield db
-        finally:
-            db.close()
-
-    app.dependency_overrides[get_database_session] = override_get_db
-
-    with TestClient(app) as test_client:
-        yield test_client
-
-    app.dependency_overrides.clear()
+# Reference time for sample match dates
+FIXED_NOW = datetime(2024, 1, 1, 12, 0, 0, tzinfo=timezone.utc)
 
 
 @pytest.fixture
-def sample_match(test_db):
-    """Create a sample match for testing."""
-    db = test_db()
-
-    match = Match(
-        fogis_match_id=123456,
-        home_team="AIK",
-        away_team="Hammarby",
-        home_team_id=1001,
-        away_team_id=1002,
-        match_date=datetime.now(timezone.utc) + timedelta(days=1),
-        venue="Friends Arena",
-        competition="Allsvenskan",
-        status="scheduled",
-        referee_id=5001,
-        referee_name="Test Referee",
-    )
-
-    db.add(match)
-    db.commit()
-    db.refresh(match)  # Refresh to get the ID
-    match_id = match.id
-    db.close()
-
-    # Return just the ID since the object becomes detached
-    return type('MockMatch', (), {'id': match_id})()
-
-
-def test_get_matches_default(client: TestClient):
+def sample_match(db_connection):
+    """Insert a sample match inside the test transaction and return its ID."""
+    return db_connection.execute(
+        insert(Match).values(
+            fogis_match_id=123456,
+            home_team="AIK",
+            away_team="Hammarby",
+            home_team_id=1001,
+            away_team_id=1002,
+            match_date=FIXED_NOW + timedelta(days=1),
+            venue="Friends Arena",
+            competition="Allsvenskan",
+            status="scheduled",
+            referee_id=5001,
+            referee_name="Test Referee",
+        ).returning(Match.id)
+    ).scalar_one()
+
+
+async def test_get_matches_default(aclient: httpx.AsyncClient):
     """Test getting matches with default parameters."""
-    response = client.get("/api/v1/matches/")
+    response = await aclient.get("/api/v1/matches/")
     
     assert response.status_code == 200
     data = response.json()
@@ -97,9 +50,9 @@ def test_get_matches_default(client: TestClient):
     assert isinstance(data["matches"], list)
 
 
-def test_get_matches_with_pagination(client: TestClient):
+async def test_get_matches_with_pagination(aclient: httpx.AsyncClient):
     """Test getting matches with pagination parameters."""
-    response = client.get("/api/v1/matches/?limit=5&offset=0")
+    response = await aclient.get("/api/v1/matches/?limit=5&offset=0")
     
     assert response.status_code == 200
     data = response.json()
@@ -108,9 +61,9 @@ def test_get_matches_with_pagination(client: TestClient):
     assert data["offset"] == 0
 
 
-def test_get_matches_with_status_filter(client: TestClient):
+async def test_get_matches_with_status_filter(aclient: httpx.AsyncClient):
     """Test getting matches with status filter."""
-    response = client.get("/api/v1/matches/?status=scheduled")
+    response = await aclient.get("/api/v1/matches/?status=scheduled")
     
     assert response.status_code == 200
     data = response.json()
@@ -120,29 +73,29 @@ def test_get_matches_with_status_filter(client: TestClient):
         assert match["status"] == "scheduled"
 
 
-def test_get_matches_invalid_pagination(client: TestClient):
+async def test_get_matches_invalid_pagination(aclient: httpx.AsyncClient):
     """Test getting matches with invalid pagination parameters."""
     # Test negative offset
-    response = client.get("/api/v1/matches/?offset=-1")
+    response = await aclient.get("/api/v1/matches/?offset=-1")
     assert response.status_code == 422
     
     # Test limit too high
-    response = client.get("/api/v1/matches/?limit=101")
+    response = await aclient.get("/api/v1/matches/?limit=101")
     assert response.status_code == 422
     
     # Test limit too low
-    response = client.get("/api/v1/matches/?limit=0")
+    response = await aclient.get("/api/v1/matches/?limit=0")
     assert response.status_code == 422
 
 
-def test_get_specific_match(client: TestClient, sample_match):
+async def test_get_specific_match(aclient: httpx.AsyncClient, sample_match):
     """Test getting a specific match by ID."""
-    response = client.get(f"/api/v1/matches/{sample_match.id}")
+    response = await aclient.get(f"/api/v1/matches/{sample_match}")
 
     assert response.status_code == 200
     data = response.json()
 
-    assert data["id"] == sample_match.id
+    assert data["id"] == sample_match
     assert data["home_team"] == "AIK"  # From fixture data
     assert data["away_team"] == "Hammarby"  # From fixture data
     assert "date" in data
@@ -152,9 +105,9 @@ def test_get_specific_match(client: TestClient, sample_match):
     assert "events" in data
 
 
-def test_get_nonexistent_match(client: TestClient):
+async def test_get_nonexistent_match(aclient: httpx.AsyncClient):
     """Test getting a non-existent match."""
-    response = client.get("/api/v1/matches/999999")
+    response = await aclient.get("/api/v1/matches/999999")
     
     assert response.status_code == 404
     data = response.json()
@@ -163,29 +116,29 @@ def test_get_nonexistent_match(client: TestClient):
     assert data["detail"] == "Match not found"
 
 
-def test_start_match_reporting(client: TestClient, sample_match):
+async def test_start_match_reporting(aclient: httpx.AsyncClient, sample_match):
     """Test starting match reporting."""
-    response = client.post(f"/api/v1/matches/{sample_match.id}/start")
+    response = await aclient.post(f"/api/v1/matches/{sample_match}/start")
 
     assert response.status_code == 200
     data = response.json()
 
     assert "message" in data
-    assert data["match_id"] == sample_match.id
+    assert data["match_id"] == sample_match
     assert data["status"] == "active"
 
 
-def test_stop_match_reporting(client: TestClient, sample_match):
+async def test_stop_match_reporting(aclient: httpx.AsyncClient, sample_match):
     """Test stopping match reporting."""
     # First start the match
-    client.post(f"/api/v1/matches/{sample_match.id}/start")
+    await aclient.post(f"/api/v1/matches/{sample_match}/start")
 
     # Then stop it
-    response = client.post(f"/api/v1/matches/{sample_match.id}/stop")
+    response = await aclient.post(f"/api/v1/matches/{sample_match}/stop")
 
     assert response.status_code == 200
     data = response.json()
 
     assert "message" in data
-    assert data["match_id"] == sample_match.id
+    assert data["match_id"] == sample_match
     assert data["status"] == "completed"
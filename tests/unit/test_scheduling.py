@@ -0,0 +1,53 @@
+"""
+Unit tests for periodic scheduling helpers.
+"""
+
+import asyncio
+import pytest
+
+from src.nlp_match_event_reporter.core.scheduling import run_periodic
+
+
+async def test_run_periodic_keeps_fixed_cadence():
+    """Test that time spent working does not delay later runs."""
+    loop = asyncio.get_running_loop()
+    starts = []
+    
+    async def work():
+        starts.append(loop.time())
+        await asyncio.sleep(0.04)
+    
+    await run_periodic(work, 0.05, lambda: len(starts) < 5, error_delay=0.0, name="test")
+    
+    # Sleeping a full interval after each run would start the fifth run at ~0.36s
+    assert starts[-1] - starts[0] < 0.3
+
+
+async def test_run_periodic_continues_after_errors():
+    """Test that a failing run is retried after the error delay."""
+    calls = []
+    
+    async def work():
+        calls.append(1)
+        if len(calls) == 1:
+            raise RuntimeError("boom")
+    
+    await run_periodic(work, 0.0, lambda: len(calls) < 3, error_delay=0.0, name="test")
+    
+    assert len(calls) == 3
+
+
+async def test_run_periodic_skips_missed_runs_after_overrun():
+    """Test that an overrunning run does not trigger a burst of catch-up runs."""
+    loop = asyncio.get_running_loop()
+    starts = []
+    
+    async def work():
+        starts.append(loop.time())
+        if len(starts) == 1:
+            await asyncio.sleep(0.15)
+    
+    await run_periodic(work, 0.05, lambda: len(starts) < 3, error_delay=0.0, name="test")
+    
+    # The third run waits a full interval after the second instead of firing at once
+    assert starts[2] - starts[1] >= 0.04
@@ -3,8 +3,11 @@ Unit tests for Pydantic schemas.
 """
 
 import pytest
+import orjson
 from datetime import datetime
-from pydantic import ValidationError
+from types import MappingProxyType
+from typing import List
+from pydantic import TypeAdapter, ValidationError
 
 from src.nlp_match_event_reporter.models.schemas import (
     MatchResponse,
@@ -16,10 +19,17 @@ from src.nlp_match_event_reporter.models.schemas import (
     HealthResponse,
 )
 
+# Built once so each test only pays for validation, not schema construction
+MATCH_ADAPTER = TypeAdapter(MatchResponse)
+MATCH_LIST_ADAPTER = TypeAdapter(MatchListResponse)
+EVENT_CREATE_ADAPTER = TypeAdapter(EventCreateRequest)
+EVENT_LIST_ADAPTER = TypeAdapter(List[EventResponse])
 
-def test_match_response_schema():
-    """Test MatchResponse schema validation."""
-    valid_data = {
+
+@pytest.fixture(scope="module")
+def match_payload():
+    """Minimal valid MatchResponse data shared by the tests in this module (read-only)."""
+    return MappingProxyType({
         "id": 1,
         "home_team": "AIK",
         "away_team": "Hammarby",
@@ -28,95 +38,75 @@ def test_match_response_schema():
         "venue": "Friends Arena",
         "status": "scheduled",
         "competition": "Allsvenskan",
+        "events": []
+    })
+
+
+@pytest.fixture(scope="module")
+def event_payload():
+    """Minimal valid EventCreateRequest data shared by the tests in this module (read-only)."""
+    return MappingProxyType({
+        "match_id": 1,
+        "event_type": "goal",
+        "minute": 15,
+        "description": "Goal scored"
+    })
+
+
+def test_match_response_schema(match_payload):
+    """Test MatchResponse schema validation."""
+    valid_data = {
+        **match_payload,
         "home_team_id": 1001,
         "away_team_id": 1002,
         "referee_id": 5001,
-        "events": []
     }
     
-    match = MatchResponse(**valid_data)
+    match = MATCH_ADAPTER.validate_python(valid_data)
     assert match.id == 1
     assert match.home_team == "AIK"
     assert match.away_team == "Hammarby"
     assert match.events == []
 
 
-def test_match_response_optional_fields():
+def test_match_response_optional_fields(match_payload):
     """Test MatchResponse with optional fields."""
-    minimal_data = {
-        "id": 1,
-        "home_team": "AIK",
-        "away_team": "Hammarby",
-        "date": "2025-08-20",
-        "time": "19:00",
-        "venue": "Friends Arena",
-        "status": "scheduled",
-        "competition": "Allsvenskan",
-        "events": []
-    }
-    
-    match = MatchResponse(**minimal_data)
+    match = MATCH_ADAPTER.validate_python(match_payload)
     assert match.home_team_id is None
     assert match.away_team_id is None
     assert match.referee_id is None
 
 
-def test_match_list_response_schema():
+def test_match_list_response_schema(match_payload):
     """Test MatchListResponse schema validation."""
-    data = {
-        "matches": [
-            {
-                "id": 1,
-                "home_team": "AIK",
-                "away_team": "Hammarby",
-                "date": "2025-08-20",
-                "time": "19:00",
-                "venue": "Friends Arena",
-                "status": "scheduled",
-                "competition": "Allsvenskan",
-                "events": []
-            }
-        ],
-        "total": 1,
-        "limit": 10,
-        "offset": 0
-    }
-    
-    response = MatchListResponse(**data)
+    response = MATCH_LIST_ADAPTER.validate_python(
+        {"matches": [match_payload], "total": 1, "limit": 10, "offset": 0}
+    )
     assert len(response.matches) == 1
     assert response.total == 1
     assert response.limit == 10
     assert response.offset == 0
 
 
-def test_event_create_request_schema():
+def test_event_create_request_schema(event_payload):
     """Test EventCreateRequest schema validation."""
     valid_data = {
-        "match_id": 1,
-        "event_type": "goal",
-        "minute": 15,
+        **event_payload,
         "description": "Goal scored by Erik Karlsson",
         "player_name": "Erik Karlsson",
         "team": "AIK"
     }
     
-    event = EventCreateRequest(**valid_data)
+    event = EVENT_CREATE_ADAPTER.validate_python(valid_data)
     assert event.match_id == 1
     assert event.event_type == "goal"
     assert event.minute == 15
     assert event.player_name == "Erik Karlsson"
 
 
-def test_event_create_request_optional_fields():
+def test_event_create_request_optional_fields(event_payload):
     """Test EventCreateRequest with optional fields."""
-    minimal_data = {
-        "match_id": 1,
-        "event_type": "goal",
-        "minute": 15,
-        "description": "Goal scored"
-    }
-    
-    event = EventCreateRequest(**minimal_data)
+    event = EVENT_CREATE_ADAPTER.validate_python(event_payload)
     assert event.player_name is None
     assert event.team is None
 
@@ -124,21 +114,21 @@ def test_event_create_request_optional_fields():
 def test_event_create_request_validation():
     """Test EventCreateRequest validation rules."""
     # Test valid request
-    valid_request = EventCreateRequest(
-        match_id=1,
-        event_type="goal",
-        minute=15,
-        description="Valid goal"
-    )
+    valid_request = EVENT_CREATE_ADAPTER.validate_python({
+        "match_id": 1,
+        "event_type": "goal",
+        "minute": 15,
+        "description": "Valid goal"
+    })
     assert valid_request.minute == 15
 
     # Test edge cases that should work
-    edge_request = EventCreateRequest(
-        match_id=1,
-        event_type="goal",
-        minute=0,  # Start of match
-        description="Goal at start"
-    )
+    edge_request = EVENT_CREATE_ADAPTER.validate_python({
+        "match_id": 1,
+        "event_type": "goal",
+        "minute": 0,  # Start of match
+        "description": "Goal at start"
+    })
     assert edge_request.minute == 0
 
 
@@ -156,7 +146,7 @@ def test_event_response_schema():
         "synced_to_fogis": True
     }
 
-    event = EventResponse(**data)
+    event = EventResponse.model_validate(data)
     assert event.id == 1
     assert event.event_type == "goal"
     assert event.minute == 15
@@ -182,7 +172,10 @@ def test_event_list_response_schema():
         "offset": 0
     }
 
-    response = EventListResponse(**data)
+    events = EVENT_LIST_ADAPTER.validate_python(data["events"])
+    assert [event.event_type for event in events] == ["goal"]
+
+    response = EventListResponse.model_validate(data)
     assert len(response.events) == 1
     assert response.total == 1
     assert response.limit == 50
@@ -204,7 +197,7 @@ def test_health_response_schema():
         }
     }
 
-    response = HealthResponse(**data)
+    response = HealthResponse.model_validate(data)
     assert response.status == "healthy"
     assert response.version == "1.0.0"
     assert response.environment == "development"
@@ -212,39 +205,22 @@ def test_health_response_schema():
     assert response.configuration["debug"] is True
 
 
-def test_schema_serialization():
+def test_schema_serialization(match_payload):
     """Test schema serialization to dict."""
-    match_data = {
-        "id": 1,
-        "home_team": "AIK",
-        "away_team": "Hammarby",
-        "date": "2025-08-20",
-        "time": "19:00",
-        "venue": "Friends Arena",
-        "status": "scheduled",
-        "competition": "Allsvenskan",
-        "events": []
-    }
-    
-    match = MatchResponse(**match_data)
-    serialized = match.model_dump()
+    # Trusted data; validation is covered by test_match_response_schema
+    match = MatchResponse.model_construct(**match_payload)
+    serialized = MATCH_ADAPTER.dump_python(match)
     
     assert isinstance(serialized, dict)
     assert serialized["id"] == 1
     assert serialized["home_team"] == "AIK"
 
 
-def test_schema_json_serialization():
+def test_schema_json_serialization(event_payload):
     """Test schema JSON serialization."""
-    event_data = {
-        "match_id": 1,
-        "event_type": "goal",
-        "minute": 15,
-        "description": "Goal scored"
-    }
-    
-    event = EventCreateRequest(**event_data)
-    json_str = event.model_dump_json()
+    event = EVENT_CREATE_ADAPTER.validate_python(event_payload)
+    json_bytes = orjson.dumps(EVENT_CREATE_ADAPTER.dump_python(event))
+    json_str = json_bytes.decode()
     
     assert isinstance(json_str, str)
     assert "goal" in json_str
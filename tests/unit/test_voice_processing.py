@@ -4,10 +4,18 @@ Unit tests for voice processing services.
 
 import pytest
 import asyncio
-import tempfile
+import base64
+import dataclasses
+import sys
+import threading
 import os
+import io
+import wave
 from unittest.mock import patch, MagicMock
 
+import numpy as np
+
+from src.nlp_match_event_reporter.services import voice_processing
 from src.nlp_match_event_reporter.services.voice_processing import (
     WhisperService,
     KokoroTTSService,
@@ -16,25 +24,91 @@ from src.nlp_match_event_reporter.services.voice_processing import (
     TTSResult,
     encode_audio_base64,
     decode_audio_base64,
+    decode_wav_audio,
+    encode_wav_audio,
     save_audio_file,
 )
 from src.nlp_match_event_reporter.core.exceptions import VoiceProcessingError
 
 
-@pytest.fixture
+# A simple WAV-like header followed by silence
+SAMPLE_AUDIO_BYTES = b"RIFF\x24\x08\x00\x00WAVEfmt \x10\x00\x00\x00" + b"\x00" * 100
+SAMPLE_AUDIO_BASE64 = base64.b64encode(SAMPLE_AUDIO_BYTES).decode("ascii")
+
+
+@pytest.fixture(scope="module")
 def sample_audio_data():
-    """Create sample audio data for testing."""
-    # Create a simple WAV-like header + some data
-    return b"RIFF\x24\x08\x00\x00WAVEfmt \x10\x00\x00\x00" + b"\x00" * 100
+    """Provide the shared, immutable sample audio bytes."""
+    return SAMPLE_AUDIO_BYTES
+
+
+@pytest.fixture(autouse=True)
+def clear_loaded_models():
+    """Keep mocked Whisper models from leaking between tests through the model cache."""
+    voice_processing._loaded_models.clear()
+    yield
+    voice_processing._loaded_models.clear()
+
+
+@pytest.fixture(scope="class")
+def _whisper_module():
+    """Install one mocked whisper module for every test in the requesting class."""
+    whisper_module = MagicMock()
+    with patch.dict('sys.modules', {'whisper': whisper_module}):
+        yield whisper_module
+
+
+@pytest.fixture(scope="class")
+def _whisper_model():
+    """Mocked Whisper model shared by the tests in the requesting class."""
+    return MagicMock()
+
+
+@pytest.fixture
+def mock_torch(monkeypatch):
+    """Install a minimal torch module whose stack works on numpy arrays."""
+    torch_module = MagicMock()
+    torch_module.stack.side_effect = np.stack
+    torch_module.cuda.is_available.return_value = False
+    monkeypatch.setitem(sys.modules, "torch", torch_module)
+    return torch_module
+
+
+@pytest.fixture
+def mock_model(_whisper_model):
+    """Provide the mocked Whisper model with its configuration and calls cleared."""
+    _whisper_model.reset_mock(return_value=True, side_effect=True)
+    return _whisper_model
+
+
+@pytest.fixture
+def mock_whisper(_whisper_module, mock_model):
+    """Provide the mocked whisper module, loading the shared mock model."""
+    _whisper_module.reset_mock(return_value=True, side_effect=True)
+    _whisper_module.load_model.return_value = mock_model
+    return _whisper_module
+
+
+def make_wav(samples: np.ndarray, sample_rate: int = 16000, channels: int = 1) -> bytes:
+    """Encode int16 samples as an in-memory PCM WAV file."""
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(channels)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes(samples.astype("<i2").tobytes())
+    return buffer.getvalue()
 
 
 class TestWhisperService:
     """Test cases for WhisperService."""
     
     @pytest.fixture
-    def whisper_service(self):
-        """Create a WhisperService instance."""
-        return WhisperService()
+    async def whisper_service(self):
+        """Create a WhisperService instance, shutting down its worker afterwards."""
+        service = WhisperService()
+        yield service
+        await service.close()
     
     def test_initialization(self, whisper_service):
         """Test WhisperService initialization."""
@@ -42,77 +116,175 @@ class TestWhisperService:
         assert whisper_service.model_size == "base"
         assert not whisper_service._initialized
     
-    @pytest.mark.asyncio
-    async def test_initialize_without_whisper(self, whisper_service):
+    async def test_initialize_without_whisper(self, whisper_service, monkeypatch):
         """Test initialization when Whisper is not installed."""
-        with patch('builtins.__import__', side_effect=ImportError("No module named 'whisper'")):
-            with pytest.raises(VoiceProcessingError, match="Whisper not installed"):
-                await whisper_service.initialize()
+        # A None entry makes "import whisper" raise ImportError
+        monkeypatch.setitem(sys.modules, "whisper", None)
+        
+        with pytest.raises(VoiceProcessingError, match="Whisper not installed"):
+            await whisper_service.initialize()
     
-    @pytest.mark.asyncio
-    async def test_initialize_success(self, whisper_service):
+    async def test_initialize_success(self, whisper_service, mock_whisper, mock_model):
         """Test successful initialization."""
-        mock_whisper = MagicMock()
-        mock_model = MagicMock()
-        mock_whisper.load_model.return_value = mock_model
         
-        with patch.dict('sys.modules', {'whisper': mock_whisper}):
-            await whisper_service.initialize()
-            
-            assert whisper_service._initialized
-            assert whisper_service.model == mock_model
-            mock_whisper.load_model.assert_called_once_with("base")
-    
-    @pytest.mark.asyncio
-    async def test_transcribe_audio_success(self, whisper_service, sample_audio_data):
-        """Test successful audio transcription."""
+        await whisper_service.initialize()
+        
+        assert whisper_service._initialized
+        assert whisper_service.model == mock_model
+        mock_whisper.load_model.assert_called_once_with("base", device=whisper_service.device)
+
+    async def test_initialize_reuses_loaded_model(self, whisper_service, mock_whisper):
+        """Services with the same size and device should share one loaded model."""
+        other_service = WhisperService()
+
+        await whisper_service.initialize()
+        await other_service.initialize()
+
+        assert other_service.model is whisper_service.model
+        mock_whisper.load_model.assert_called_once()
+
+    @pytest.mark.parametrize("source", ["bytes", "file"])
+    async def test_transcribe_audio_success(self, whisper_service, mock_whisper, mock_model, sample_audio_data, tmp_path, source):
+        """Test successful transcription of raw audio bytes and of an audio file."""
         # Mock Whisper
-        mock_whisper = MagicMock()
-        mock_model = MagicMock()
         mock_result = {
             "text": "Test transcription",
             "language": "en",
             "segments": [{"avg_logprob": -0.5}]
         }
         mock_model.transcribe.return_value = mock_result
-        mock_whisper.load_model.return_value = mock_model
         
-        with patch.dict('sys.modules', {'whisper': mock_whisper}):
+        if source == "file":
+            audio_path = tmp_path / "audio.wav"
+            audio_path.write_bytes(sample_audio_data)
+            result = await whisper_service.transcribe_file(str(audio_path))
+        else:
             result = await whisper_service.transcribe_audio(sample_audio_data)
-            
-            assert isinstance(result, TranscriptionResult)
-            assert result.text == "Test transcription"
-            assert result.language == "en"
-            assert 0.0 <= result.confidence <= 1.0
-            assert result.processing_time > 0
-    
-    @pytest.mark.asyncio
-    async def test_transcribe_file(self, whisper_service):
-        """Test file transcription."""
-        # Create temporary audio file
-        with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as temp_file:
-            temp_file.write(b"fake audio data")
-            temp_path = temp_file.name
-        
-        try:
-            # Mock Whisper
-            mock_whisper = MagicMock()
-            mock_model = MagicMock()
-            mock_result = {
-                "text": "File transcription",
-                "language": "en",
-                "segments": []
-            }
-            mock_model.transcribe.return_value = mock_result
-            mock_whisper.load_model.return_value = mock_model
-            
-            with patch.dict('sys.modules', {'whisper': mock_whisper}):
-                result = await whisper_service.transcribe_file(temp_path)
-                
-                assert isinstance(result, TranscriptionResult)
-                assert result.text == "File transcription"
-        finally:
-            os.unlink(temp_path)
+        
+        assert isinstance(result, TranscriptionResult)
+        assert result.text == "Test transcription"
+        assert result.language == "en"
+        assert result.confidence == pytest.approx(np.exp(-0.5))
+        assert result.processing_time > 0
+    
+    async def test_transcribe_wav_in_memory(self, whisper_service, mock_whisper, mock_model):
+        """Test that long PCM WAV audio is passed to Whisper as a waveform."""
+        mock_model.transcribe.return_value = {"text": "Mål", "language": "sv", "segments": []}
+        num_samples = 31 * 16000
+        
+        await whisper_service.transcribe_audio(make_wav(np.zeros(num_samples)))
+        
+        audio = mock_model.transcribe.call_args.args[0]
+        assert isinstance(audio, np.ndarray)
+        assert audio.dtype == np.float32
+        assert audio.shape == (num_samples,)
+
+    async def test_single_short_clip_uses_full_transcribe(self, whisper_service, mock_whisper, mock_model):
+        """Test that a lone short clip keeps model.transcribe() and its segments."""
+        segments = [{"text": "Mål", "avg_logprob": -0.2}]
+        mock_model.transcribe.return_value = {"text": "Mål", "language": "sv", "segments": segments}
+        
+        result = await whisper_service.transcribe_audio(make_wav(np.zeros(1600)))
+        
+        mock_whisper.decode.assert_not_called()
+        mock_model.transcribe.assert_called_once()
+        assert result.segments == segments
+        assert result.confidence == pytest.approx(np.exp(-0.2))
+    
+    async def test_transcription_runs_on_dedicated_worker(self, whisper_service, mock_whisper, mock_model):
+        """Test that Whisper inference runs on the service's own worker thread."""
+        thread_names = []
+        mock_model.transcribe.side_effect = lambda audio, **options: (
+            thread_names.append(threading.current_thread().name)
+            or {"text": "Mål", "language": "sv", "segments": []}
+        )
+
+        await whisper_service.transcribe_audio(make_wav(np.zeros(31 * 16000)))
+        await whisper_service.close()
+
+        assert thread_names[0].startswith("whisper")
+        assert whisper_service._executor is None
+
+    async def test_concurrent_short_clips_are_batched(self, whisper_service, mock_whisper, mock_torch):
+        """Test that concurrent short transcriptions share one batched decode."""
+        mock_whisper.pad_or_trim.side_effect = lambda audio: audio
+        mock_whisper.log_mel_spectrogram.side_effect = lambda audio, **kwargs: audio
+        mock_whisper.decode.side_effect = lambda model, mel, options: [
+            MagicMock(text=f"clip {i}", avg_logprob=-0.1, language="sv")
+            for i in range(len(mel))
+        ]
+        clip = make_wav(np.zeros(1600))
+        
+        await whisper_service.initialize()
+        results = await asyncio.gather(
+            *(whisper_service.transcribe_audio(clip, language="sv") for _ in range(3))
+        )
+        await whisper_service.close()
+        
+        mock_whisper.decode.assert_called_once()
+        assert [result.text for result in results] == ["clip 0", "clip 1", "clip 2"]
+    
+    async def test_transcribe_batch(self, whisper_service, mock_whisper, mock_torch):
+        """Test that several clips are decoded in one batch."""
+        mock_whisper.pad_or_trim.side_effect = lambda audio: audio
+        mock_whisper.log_mel_spectrogram.side_effect = lambda audio, **kwargs: audio
+        mock_whisper.decode.return_value = [
+            MagicMock(text=" Mål för AIK ", avg_logprob=-0.1, language="sv"),
+            MagicMock(text="Gult kort", avg_logprob=-0.3, language="sv"),
+        ]
+        audios = [np.zeros(16000, dtype=np.float32), np.zeros(16000, dtype=np.float32)]
+        
+        results = await whisper_service.transcribe_batch(audios, language="sv")
+        
+        mock_whisper.decode.assert_called_once()
+        mel = mock_whisper.decode.call_args.args[1]
+        assert mel.shape == (2, 16000)
+        assert mock_whisper.log_mel_spectrogram.call_count == 2
+        assert [result.text for result in results] == ["Mål för AIK", "Gult kort"]
+        assert all(0.0 <= result.confidence <= 1.0 for result in results)
+    
+    async def test_batched_clip_features_match_single_clip(self, whisper_service, mock_whisper, mock_torch):
+        """Test that a clip's features do not depend on the clips batched with it."""
+        def log_mel_spectrogram(audio, **kwargs):
+            # Mirrors Whisper's floor clamp relative to the input's maximum
+            log_spec = np.log10(np.maximum(audio ** 2, 1e-10))
+            return np.maximum(log_spec, log_spec.max() - 8.0)
+        
+        mock_whisper.pad_or_trim.side_effect = lambda audio: audio
+        mock_whisper.log_mel_spectrogram.side_effect = log_mel_spectrogram
+        mock_whisper.decode.side_effect = lambda model, mel, options: [
+            MagicMock(text="", avg_logprob=-0.1, language="sv") for _ in mel
+        ]
+        quiet = np.full(16000, 1e-3, dtype=np.float32)
+        quiet[::2] = 1e-7
+        loud = np.ones(16000, dtype=np.float32)
+        
+        await whisper_service.transcribe_batch([quiet], language="sv")
+        alone = mock_whisper.decode.call_args.args[1][0]
+        await whisper_service.transcribe_batch([quiet, loud], language="sv")
+        batched = mock_whisper.decode.call_args.args[1][0]
+        
+        np.testing.assert_array_equal(batched, alone)
+    
+    async def test_encoded_audio_reuses_scratch_file(self, whisper_service, mock_whisper, mock_model):
+        """Test that non-WAV audio is written to one reused scratch file per worker."""
+        seen = []
+
+        def transcribe(path, **options):
+            with open(path, "rb") as f:
+                seen.append((path, f.read()))
+            return {"text": "Mål", "language": "sv", "segments": []}
+
+        mock_model.transcribe.side_effect = transcribe
+
+        await whisper_service.transcribe_audio(b"first clip")
+        await whisper_service.transcribe_audio(b"second")
+        scratch_dir = whisper_service._scratch_dir
+        await whisper_service.close()
+
+        assert seen[0][0] == seen[1][0]
+        assert [data for _, data in seen] == [b"first clip", b"second"]
+        assert not os.path.exists(scratch_dir)
 
 
 class TestKokoroTTSService:
@@ -129,13 +301,11 @@ class TestKokoroTTSService:
         assert not tts_service._initialized
         assert tts_service.sample_rate == 22050
     
-    @pytest.mark.asyncio
     async def test_initialize_success(self, tts_service):
         """Test successful initialization."""
         await tts_service.initialize()
         assert tts_service._initialized
     
-    @pytest.mark.asyncio
     async def test_synthesize_speech(self, tts_service):
         """Test speech synthesis."""
         result = await tts_service.synthesize_speech("Hello world")
@@ -145,8 +315,62 @@ class TestKokoroTTSService:
         assert result.sample_rate == 22050
         assert result.duration > 0
         assert result.processing_time > 0
+        
+        # Placeholder output is silent 16-bit PCM
+        assert len(result.audio_data) == 2 * int(22050 * result.duration)
+        assert not any(result.audio_data)
     
-    @pytest.mark.asyncio
+    async def test_synthesize_speech_reuses_silence_buffer(self, tts_service):
+        """Test that placeholder audio of the same length is not reallocated."""
+        first = await tts_service.synthesize_speech("Mål AIK")
+        second = await tts_service.synthesize_speech("Mål DIF")
+        
+        assert first.audio_data is second.audio_data
+
+    async def test_synthesize_speech_does_not_share_long_silence(self, tts_service, monkeypatch):
+        """Test that silence longer than the shared-buffer cap is allocated per call."""
+        monkeypatch.setattr(voice_processing, "SILENCE_CACHE_MAX_SAMPLES", 1000)
+        first = await tts_service.synthesize_speech("Mål AIK")
+        second = await tts_service.synthesize_speech("Mål DIF")
+        
+        assert first.audio_data == second.audio_data
+        assert first.audio_data is not second.audio_data
+
+    async def test_synthesize_speech_memoizes_phrases(self, tts_service, monkeypatch):
+        """Test that repeated phrases with the same settings are rendered once."""
+        sleeps = []
+        monkeypatch.setattr(voice_processing.time, "sleep", sleeps.append)
+
+        await tts_service.synthesize_speech("Gult kort för AIK", voice="sv")
+        await tts_service.synthesize_speech("Gult kort för AIK", voice="sv")
+        await tts_service.synthesize_speech("Gult kort för AIK", voice="sv", speed=1.5)
+
+        assert len(sleeps) == 2
+        assert tts_service._render_cached.cache_info().hits == 1
+
+    async def test_synthesize_speech_renders_long_text_uncached(self, tts_service, monkeypatch):
+        """Test that texts over TTS_CACHE_MAX_CHARS are not kept in the phrase cache."""
+        monkeypatch.setattr(voice_processing, "TTS_CACHE_MAX_CHARS", 10)
+
+        await tts_service.synthesize_speech("Byte i AIK, nummer 9 in")
+        await tts_service.synthesize_speech("Byte i AIK, nummer 9 in")
+
+        assert tts_service._render_cached.cache_info().currsize == 0
+
+    async def test_store_audio_keeps_recent_renderings(self, tts_service, monkeypatch):
+        """Test that stored renderings can be fetched by id and the oldest are dropped."""
+        monkeypatch.setattr(voice_processing, "TTS_AUDIO_STORE_SIZE", 2)
+        result = await tts_service.synthesize_speech("Hörna AIK")
+
+        first = tts_service.store_audio(result)
+        second = tts_service.store_audio(result)
+        third = tts_service.store_audio(result)
+
+        assert tts_service.get_stored_audio(first) is None
+        assert tts_service.get_stored_audio(second) is result
+        assert tts_service.get_stored_audio(third) is result
+        assert tts_service.get_stored_audio("missing") is None
+
     async def test_synthesize_speech_with_parameters(self, tts_service):
         """Test speech synthesis with custom parameters."""
         result = await tts_service.synthesize_speech(
@@ -175,13 +399,11 @@ class TestPorcupineHotwordService:
         assert not hotword_service._is_listening
         assert hotword_service._detection_callback is None
     
-    @pytest.mark.asyncio
     async def test_initialize_success(self, hotword_service):
         """Test successful initialization."""
         await hotword_service.initialize()
         assert hotword_service._initialized
     
-    @pytest.mark.asyncio
     async def test_start_listening(self, hotword_service):
         """Test starting hotword detection."""
         callback = MagicMock()
@@ -193,7 +415,6 @@ class TestPorcupineHotwordService:
         assert hotword_service._detection_callback == callback
         assert hotword_service._listen_task is not None
     
-    @pytest.mark.asyncio
     async def test_stop_listening(self, hotword_service):
         """Test stopping hotword detection."""
         # First start listening
@@ -207,7 +428,6 @@ class TestPorcupineHotwordService:
         assert hotword_service._detection_callback is None
         assert hotword_service._listen_task is None
     
-    @pytest.mark.asyncio
     async def test_start_listening_already_active(self, hotword_service):
         """Test starting hotword detection when already active."""
         callback = MagicMock()
@@ -227,6 +447,90 @@ class TestPorcupineHotwordService:
         
         hotword_service._is_listening = True
         assert hotword_service.is_listening
+    
+    async def test_porcupine_detects_keyword_from_audio_callback(self, hotword_service, monkeypatch):
+        """Test that frames pushed by the audio callback are run through Porcupine."""
+        porcupine = MagicMock(sample_rate=16000, frame_length=512)
+        porcupine.process.side_effect = [-1, 1]
+        mock_pvporcupine = MagicMock()
+        mock_pvporcupine.create.return_value = porcupine
+        mock_pyaudio = MagicMock()
+        audio_interface = mock_pyaudio.PyAudio.return_value
+        monkeypatch.setattr(voice_processing, "pvporcupine", mock_pvporcupine)
+        monkeypatch.setattr(voice_processing, "pyaudio", mock_pyaudio)
+        monkeypatch.setenv("PICOVOICE_ACCESS_KEY", "test-key")
+        
+        detected = asyncio.Event()
+        keywords = []
+        
+        def callback(keyword):
+            keywords.append(keyword)
+            detected.set()
+        
+        await hotword_service.start_listening(["porcupine", "bumblebee"], callback, sensitivity=0.7)
+        await asyncio.sleep(0)
+        
+        # Feed two frames from a separate thread, as PortAudio would
+        stream_callback = audio_interface.open.call_args.kwargs["stream_callback"]
+        frame = bytes(512 * 2)
+        await asyncio.to_thread(stream_callback, frame, 512, None, 0)
+        await asyncio.to_thread(stream_callback, frame, 512, None, 0)
+        await asyncio.wait_for(detected.wait(), timeout=1.0)
+        await hotword_service.stop_listening()
+        
+        assert keywords == ["bumblebee"]
+        mock_pvporcupine.create.assert_called_once_with(
+            access_key="test-key",
+            keywords=["porcupine", "bumblebee"],
+            sensitivities=[0.7, 0.7]
+        )
+        porcupine.delete.assert_called_once()
+        audio_interface.terminate.assert_called_once()
+    
+    @pytest.mark.parametrize("failing_step", ["create", "open"])
+    async def test_porcupine_setup_failure_releases_resources(self, hotword_service, monkeypatch, failing_step):
+        """Test that a failed Porcupine or audio setup cleans up and stops listening."""
+        porcupine = MagicMock(sample_rate=16000, frame_length=512)
+        mock_pvporcupine = MagicMock()
+        mock_pvporcupine.create.return_value = porcupine
+        mock_pyaudio = MagicMock()
+        audio_interface = mock_pyaudio.PyAudio.return_value
+        if failing_step == "create":
+            mock_pvporcupine.create.side_effect = RuntimeError("invalid access key")
+        else:
+            audio_interface.open.side_effect = OSError("no input device")
+        monkeypatch.setattr(voice_processing, "pvporcupine", mock_pvporcupine)
+        monkeypatch.setattr(voice_processing, "pyaudio", mock_pyaudio)
+        monkeypatch.setenv("PICOVOICE_ACCESS_KEY", "test-key")
+        
+        await hotword_service.start_listening(["porcupine"], MagicMock())
+        await hotword_service._listen_task
+        
+        assert not hotword_service.is_listening
+        assert hotword_service.porcupine is None
+        if failing_step == "create":
+            mock_pyaudio.PyAudio.assert_not_called()
+        else:
+            porcupine.delete.assert_called_once()
+            audio_interface.terminate.assert_called_once()
+
+
+class TestResultTypes:
+    """Test cases for the result dataclasses."""
+    
+    def test_results_are_immutable(self):
+        """Test that result objects cannot be modified after creation."""
+        result = TranscriptionResult(text="Mål", confidence=0.9, language="sv", processing_time=0.1)
+        
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            result.text = "Gult kort"
+    
+    @pytest.mark.skipif(sys.version_info < (3, 10), reason="dataclass slots require Python 3.10")
+    def test_results_have_no_instance_dict(self):
+        """Test that result objects use slots instead of a per-instance dict."""
+        result = TTSResult(audio_data=b"", sample_rate=16000, duration=0.0, processing_time=0.0)
+        
+        assert not hasattr(result, "__dict__")
 
 
 class TestUtilityFunctions:
@@ -234,67 +538,164 @@ class TestUtilityFunctions:
     
     def test_encode_decode_audio_base64(self, sample_audio_data):
         """Test base64 encoding and decoding of audio data."""
-        # Encode
-        encoded = encode_audio_base64(sample_audio_data)
-        assert isinstance(encoded, str)
+        assert encode_audio_base64(sample_audio_data) == SAMPLE_AUDIO_BASE64
+        assert decode_audio_base64(SAMPLE_AUDIO_BASE64) == sample_audio_data
+    
+    def test_decode_wav_audio_mixes_and_resamples(self):
+        """Test that stereo 8 kHz WAV is decoded to mono 16 kHz float32."""
+        stereo = np.tile(np.array([[16384, 0]]), (800, 1))
         
-        # Decode
-        decoded = decode_audio_base64(encoded)
-        assert decoded == sample_audio_data
+        audio = decode_wav_audio(make_wav(stereo, sample_rate=8000, channels=2))
+        
+        assert audio.dtype == np.float32
+        assert audio.shape == (1600,)
+        assert np.allclose(audio, 0.25)
     
-    def test_save_audio_file(self, sample_audio_data):
+    def test_decode_wav_audio_downsamples_with_filter(self, monkeypatch):
+        """Test that 48 kHz WAV is decimated through the anti-aliasing resampler."""
+        calls = []
+        
+        def resample_poly(audio, up, down):
+            calls.append((up, down))
+            return audio[::down]
+        
+        monkeypatch.setattr(voice_processing, "resample_poly", resample_poly)
+        
+        audio = decode_wav_audio(make_wav(np.zeros(4800), sample_rate=48000))
+        
+        assert calls == [(1, 3)]
+        assert audio.dtype == np.float32
+        assert audio.shape == (1600,)
+    
+    def test_decode_wav_audio_leaves_downsampling_to_ffmpeg_without_scipy(self, monkeypatch):
+        """Test that WAV above 16 kHz is not linearly decimated when no filter is available."""
+        monkeypatch.setattr(voice_processing, "resample_poly", None)
+        
+        assert decode_wav_audio(make_wav(np.zeros(4410), sample_rate=44100)) is None
+        assert decode_wav_audio(make_wav(np.zeros(1600), sample_rate=16000)) is not None
+    
+    def test_encode_wav_audio_round_trip(self):
+        """Test that raw PCM wrapped as WAV decodes back to the same samples."""
+        samples = np.array([0, 16384, -16384, 32767], dtype="<i2")
+        wav_bytes = encode_wav_audio(samples.tobytes(), 16000)
+
+        decoded = decode_wav_audio(wav_bytes)
+
+        np.testing.assert_allclose(decoded, samples / 32768.0, atol=1e-6)
+    
+    def test_segment_confidence(self):
+        """Test confidence scoring for short and long segment lists."""
+        short = [{"avg_logprob": -0.2}, {"avg_logprob": -0.4}]
+        long = short * 50
+        
+        assert voice_processing._segment_confidence(None) == 0.0
+        assert voice_processing._segment_confidence(short) == pytest.approx(np.exp(-0.3))
+        assert voice_processing._segment_confidence(long) == pytest.approx(np.exp(-0.3))
+        assert voice_processing._segment_confidence([{"avg_logprob": 0.5}]) == 1.0
+    
+    def test_decode_wav_audio_rejects_other_formats(self, sample_audio_data):
+        """Test that non-PCM WAV data is left for ffmpeg to decode."""
+        assert decode_wav_audio(b"not a wav file") is None
+        assert decode_wav_audio(sample_audio_data) is None
+    
+    def test_decode_wav_audio_rejects_truncated_data(self):
+        """Test that WAV data cut off mid-sample or mid-frame is left for ffmpeg."""
+        mono = make_wav(np.zeros(1600))
+        stereo = make_wav(np.zeros(3200), channels=2)
+        
+        assert decode_wav_audio(mono[:-1]) is None
+        assert decode_wav_audio(stereo[:-2]) is None
+    
+    def test_save_audio_file(self, sample_audio_data, tmp_path):
         """Test saving audio data to file."""
-        with tempfile.TemporaryDirectory() as temp_dir:
-            file_path = os.path.join(temp_dir, "test_audio.wav")
-            
-            save_audio_file(sample_audio_data, file_path)
-            
-            # Verify file was created and contains correct data
-            assert os.path.exists(file_path)
-            with open(file_path, 'rb') as f:
-                saved_data = f.read()
-            assert saved_data == sample_audio_data
-    
-    def test_save_audio_file_creates_directories(self, sample_audio_data):
+        file_path = tmp_path / "test_audio.wav"
+        
+        save_audio_file(sample_audio_data, str(file_path))
+        
+        # Verify file was created and contains correct data
+        assert file_path.read_bytes() == sample_audio_data
+    
+    def test_save_audio_file_writes_large_buffers_in_chunks(self, monkeypatch, tmp_path):
+        """Test that buffers larger than one chunk are written completely."""
+        monkeypatch.setattr(voice_processing, "SAVE_CHUNK_SIZE", 64)
+        audio_data = bytearray(os.urandom(1000))
+        file_path = tmp_path / "large.wav"
+        
+        save_audio_file(memoryview(audio_data), str(file_path))
+        
+        assert file_path.read_bytes() == audio_data
+    
+    def test_save_audio_file_creates_directories(self, sample_audio_data, tmp_path):
         """Test that save_audio_file creates parent directories."""
-        with tempfile.TemporaryDirectory() as temp_dir:
-            file_path = os.path.join(temp_dir, "subdir", "test_audio.wav")
-            
-            save_audio_file(sample_audio_data, file_path)
-            
-            # Verify file was created
-            assert os.path.exists(file_path)
+        file_path = tmp_path / "subdir" / "test_audio.wav"
+        
+        save_audio_file(sample_audio_data, str(file_path))
+        
+        # Verify file was created
+        assert file_path.exists()
 
 
 class TestIntegration:
     """Integration tests for voice processing services."""
     
-    @pytest.mark.asyncio
-    async def test_service_lifecycle(self):
+    async def test_service_lifecycle(self, mock_whisper):
         """Test complete service lifecycle."""
         whisper = WhisperService()
         tts = KokoroTTSService()
         hotword = PorcupineHotwordService()
 
-        # Mock Whisper for this test
-        mock_whisper = MagicMock()
-        mock_model = MagicMock()
-        mock_whisper.load_model.return_value = mock_model
+        # Initialize all services
+        await whisper.initialize()
+        await tts.initialize()
+        await hotword.initialize()
+
+        assert whisper._initialized
+        assert tts._initialized
+        assert hotword._initialized
+
+        # Test hotword detection lifecycle
+        callback = MagicMock()
+        await hotword.start_listening(["test"], callback)
+        assert hotword.is_listening
+
+        await hotword.stop_listening()
+        assert not hotword.is_listening
+
+    async def test_initialize_voice_services_skips_whisper_when_testing(self, monkeypatch, mock_whisper):
+        """Testing mode should bring services up without loading a Whisper model."""
+        whisper = WhisperService()
+        tts = KokoroTTSService()
+        hotword = PorcupineHotwordService()
+        monkeypatch.setattr(voice_processing, "whisper_service", whisper)
+        monkeypatch.setattr(voice_processing, "tts_service", tts)
+        monkeypatch.setattr(voice_processing, "hotword_service", hotword)
+        monkeypatch.setattr(voice_processing.settings, "TESTING", True)
+
+        await voice_processing.initialize_voice_services()
+
+        mock_whisper.load_model.assert_not_called()
+        assert not whisper._initialized
+        assert tts._initialized
+        assert hotword._initialized
+
+    async def test_initialize_voice_services_runs_concurrently(self, monkeypatch):
+        """Service initializers should overlap rather than run back to back."""
+        running = 0
+        peak = 0
 
-        with patch.dict('sys.modules', {'whisper': mock_whisper}):
-            # Initialize all services
-            await whisper.initialize()
-            await tts.initialize()
-            await hotword.initialize()
+        async def slow_initialize():
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
 
-            assert whisper._initialized
-            assert tts._initialized
-            assert hotword._initialized
+        services = [MagicMock(initialize=slow_initialize) for _ in range(3)]
+        monkeypatch.setattr(voice_processing, "whisper_service", services[0])
+        monkeypatch.setattr(voice_processing, "tts_service", services[1])
+        monkeypatch.setattr(voice_processing, "hotword_service", services[2])
+        monkeypatch.setattr(voice_processing.settings, "TESTING", False)
 
-            # Test hotword detection lifecycle
-            callback = MagicMock()
-            await hotword.start_listening(["test"], callback)
-            assert hotword.is_listening
+        await voice_processing.initialize_voice_services()
 
-            await hotword.stop_listening()
-            assert not hotword.is_listening
+        assert peak == 3